@@ -0,0 +1,56 @@
+"""
+시작(import) 시간 측정 스크립트.
+
+    python bench_startup.py [반복횟수]
+
+새 파이썬 프로세스에서 shop_db (화면 없는 데이터 모듈) 와
+mom_shop (Streamlit 화면 포함) 을 각각 import 하는 데 걸리는 시간을 잰다.
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+TARGETS = {
+    "python (빈 프로세스)": "pass",
+    "shop_db": "import shop_db",
+    "shop_db + pandas": "import shop_db, pandas",
+    "mom_shop (streamlit)": "import mom_shop",
+}
+
+CODE = """
+import time
+t0 = time.perf_counter()
+{stmt}
+print(time.perf_counter() - t0)
+"""
+
+
+def measure(stmt, repeat):
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", CODE.format(stmt=stmt)],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        times.append(float(out.stdout.strip().splitlines()[-1]))
+    return times
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print(f"import 시간 (반복 {repeat}회, 단위 ms)")
+    for label, stmt in TARGETS.items():
+        times = measure(stmt, repeat)
+        print(
+            f"- {label:20s} 중앙값 {statistics.median(times) * 1000:8.1f}"
+            f" / 최소 {min(times) * 1000:8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+저장 방식 비교 스크립트 (예전 jobs 표 ↔ 이름표 + job_rows + jobs 뷰).
+
+    python bench_storage.py [건수]
+
+예전 방식(옷 종류 / 결제수단을 글자 그대로, 작업 표시를 컬럼 3개로) DB 를 만들고
+복사본을 init_db 로 옮긴 뒤, 두 DB 의 파일 크기와 조회 시간을 잰다.
+옮긴 뒤에도 jobs 로 읽은 내용이 똑같은지 확인한다.
+"""
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ITEMS = ["바지", "치마", "셔츠/블라우스", "원피스", "자켓/코트", "청바지", "교복", "기타"]
+PAYMENTS = ["현금", "카드", "계좌이체"]
+
+# 예전 jobs 표 (이름표 도입 전 init_db 가 만들던 것)
+LEGACY_SCHEMA = [
+    """
+    CREATE TABLE jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dropoff_date TEXT NOT NULL,
+        customer_name TEXT,
+        customer_phone TEXT,
+        item_type TEXT NOT NULL,
+        work_hem INTEGER NOT NULL DEFAULT 0,
+        work_sleeve INTEGER NOT NULL DEFAULT 0,
+        work_width INTEGER NOT NULL DEFAULT 0,
+        work_other TEXT,
+        price INTEGER NOT NULL,
+        payment_method TEXT NOT NULL,
+        is_prepaid INTEGER NOT NULL DEFAULT 1,
+        pickup_date TEXT,
+        picked_up INTEGER NOT NULL DEFAULT 0,
+        memo TEXT,
+        printed_count INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT NOT NULL,
+        year_month TEXT GENERATED ALWAYS AS (substr(dropoff_date, 1, 7)) VIRTUAL,
+        iso_week TEXT GENERATED ALWAYS AS (
+            strftime('%Y', dropoff_date, '-3 days', 'weekday 4') || '-W' ||
+            printf('%02d', (CAST(strftime('%j', dropoff_date, '-3 days', 'weekday 4') AS INTEGER) - 1) / 7 + 1)
+        ) VIRTUAL,
+        dropoff_day INTEGER GENERATED ALWAYS AS (CAST(julianday(dropoff_date) - 1721424.5 AS INTEGER)) VIRTUAL,
+        pickup_day INTEGER GENERATED ALWAYS AS (CAST(julianday(pickup_date) - 1721424.5 AS INTEGER)) VIRTUAL
+    )
+    """,
+    "CREATE INDEX idx_jobs_open_pickup ON jobs(pickup_date) WHERE picked_up = 0",
+    "CREATE INDEX idx_jobs_year_month ON jobs(year_month)",
+    "CREATE INDEX idx_jobs_iso_week ON jobs(iso_week)",
+    "CREATE INDEX idx_jobs_dropoff_day ON jobs(dropoff_day)",
+    "CREATE INDEX idx_jobs_unpaid ON jobs(dropoff_date) WHERE is_prepaid = 0",
+]
+
+QUERIES = {
+    "전체 읽기 (SELECT *)": ("SELECT * FROM jobs", ()),
+    "한 달 읽기": ("SELECT * FROM jobs WHERE year_month = ?", None),
+    "종류 × 결제수단 합계": (
+        "SELECT item_type, payment_method, SUM(price), COUNT(*) FROM jobs GROUP BY 1, 2",
+        (),
+    ),
+    "작업별 건수": ("SELECT SUM(work_hem), SUM(work_sleeve), SUM(work_width) FROM jobs", ()),
+}
+
+# 뷰 대신 job_rows 에서 id / 비트로 바로 묶고 이름은 마지막에 붙이는 경우 (이름표 DB 만)
+COMPACT_QUERIES = {
+    "종류 × 결제수단 합계": """
+        SELECT t.name, p.name, s.revenue, s.garments
+        FROM (
+            SELECT item_type_id, payment_method_id, SUM(price) AS revenue, COUNT(*) AS garments
+            FROM job_rows GROUP BY 1, 2
+        ) s
+        JOIN item_types t ON t.id = s.item_type_id
+        JOIN payment_methods p ON p.id = s.payment_method_id
+    """,
+    "작업별 건수": """
+        SELECT SUM(work_flags & 1), SUM((work_flags >> 1) & 1), SUM((work_flags >> 2) & 1)
+        FROM job_rows
+    """,
+}
+
+
+def build_legacy(path, n_jobs, seed=0):
+    rnd = random.Random(seed)
+    today = date.today()
+    conn = sqlite3.connect(path)
+    for sql in LEGACY_SCHEMA:
+        conn.execute(sql)
+    rows = []
+    for _ in range(n_jobs):
+        dropoff = today - timedelta(days=rnd.randrange(3 * 365))
+        rows.append(
+            (
+                dropoff.isoformat(),
+                f"고객{rnd.randint(1, n_jobs // 3 + 1)}",
+                f"010-{rnd.randint(1000, 9999)}-{rnd.randint(1000, 9999)}",
+                rnd.choice(ITEMS),
+                rnd.randint(0, 1),
+                rnd.randint(0, 1),
+                rnd.randint(0, 1),
+                "",
+                rnd.choice([4000, 5000, 8000, 10000, 15000]),
+                rnd.choice(PAYMENTS),
+                1 if rnd.random() < 0.8 else 0,
+                (dropoff + timedelta(days=rnd.randint(1, 7))).isoformat(),
+                1 if dropoff < today - timedelta(days=14) else 0,
+                "",
+                1,
+                f"{dropoff.isoformat()} 10:00:00",
+            )
+        )
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO jobs (
+                dropoff_date, customer_name, customer_phone, item_type,
+                work_hem, work_sleeve, work_width, work_other, price, payment_method,
+                is_prepaid, pickup_date, picked_up, memo, printed_count, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+    conn.close()
+
+
+def vacuum(path):
+    conn = sqlite3.connect(path)
+    conn.execute("VACUUM")
+    conn.close()
+    return os.path.getsize(path)
+
+
+def time_query(path, sql, params, repeat=5):
+    conn = sqlite3.connect(path)
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        best = min(best, time.perf_counter() - t0)
+    conn.close()
+    return best
+
+
+def main():
+    n_jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    work = tempfile.mkdtemp(prefix="bench_storage_")
+    legacy = os.path.join(work, "legacy.db")
+    compact = os.path.join(work, "compact.db")
+    try:
+        print(f"{n_jobs:,}건 만드는 중...")
+        build_legacy(legacy, n_jobs)
+        shutil.copy(legacy, compact)
+
+        os.environ["MOM_SHOP_DB"] = compact
+        import shop_db
+
+        shop_db.DB_PATH = compact
+        t0 = time.perf_counter()
+        shop_db.init_db()
+        print(f"옮기기(init_db): {time.perf_counter() - t0:.2f}초")
+
+        # init_db 가 더한 다른 표는 빼고 jobs 내용만 비교
+        a = sqlite3.connect(legacy)
+        b = sqlite3.connect(compact)
+        columns = ", ".join(shop_db.JOB_COLUMNS)
+        same = (
+            a.execute(f"SELECT {columns} FROM jobs ORDER BY id").fetchall()
+            == b.execute(f"SELECT {columns} FROM jobs ORDER BY id").fetchall()
+        )
+        month = a.execute("SELECT MAX(year_month) FROM jobs").fetchone()[0]
+        a.close()
+        b.close()
+        print(f"jobs 내용 같음: {same}")
+
+        legacy_size = vacuum(legacy)
+        compact_size = vacuum(compact)
+        print()
+        print(f"{'':24}{'예전':>12}{'이름표':>12}")
+        print(
+            f"{'파일 크기 (VACUUM 후)':20}{legacy_size / 1024 / 1024:>11.2f}M"
+            f"{compact_size / 1024 / 1024:>11.2f}M  ({compact_size / legacy_size:.0%})"
+        )
+        for name, (sql, params) in QUERIES.items():
+            params = (month,) if params is None else params
+            t_legacy = time_query(legacy, sql, params)
+            t_compact = time_query(compact, sql, params)
+            print(
+                f"{name:20}{t_legacy * 1000:>10.1f}ms{t_compact * 1000:>10.1f}ms"
+                f"  ({t_compact / t_legacy:.0%})"
+            )
+        print()
+        print("job_rows 에서 바로 묶을 때 (이름표 DB)")
+        for name, sql in COMPACT_QUERIES.items():
+            t_legacy = time_query(legacy, QUERIES[name][0], ())
+            t_compact = time_query(compact, sql, ())
+            print(
+                f"{name:20}{t_legacy * 1000:>10.1f}ms{t_compact * 1000:>10.1f}ms"
+                f"  ({t_compact / t_legacy:.0%})"
+            )
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
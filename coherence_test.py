@@ -0,0 +1,181 @@
+"""
+프로세스 두 개가 같은 DB 를 쓸 때 캐시가 맞는지 확인하는 테스트.
+
+    python coherence_test.py
+
+임시 DB 를 만든 뒤 쓰기 전용 프로세스를 하나 띄워서
+저장 / 출력 표시 / 찾음 표시 / 삭제 / 동기화 내보내기(change_log 정리)를 한 가지씩 시키고,
+매번 이 프로세스(읽기 쪽)의 open_jobs_by_pickup / data_generation() / load_jobs_cached 가
+그 쓰기를 바로 반영하는지 확인한다. 하나라도 어긋나면 AssertionError 로 멈춘다.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import date, timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+TODAY = date.today()
+PICKUP = (TODAY + timedelta(days=3)).isoformat()
+DROPOFF = TODAY.isoformat()
+
+
+def new_job(name, price=5000):
+    return {
+        "dropoff_date": DROPOFF,
+        "customer_name": name,
+        "customer_phone": "01012345678",
+        "item_type": "바지",
+        "work_hem": 1,
+        "work_sleeve": 0,
+        "work_width": 0,
+        "work_other": "",
+        "price": price,
+        "payment_method": "카드",
+        "is_prepaid": 1,
+        "pickup_date": PICKUP,
+        "memo": "",
+    }
+
+
+# ---------------------------
+# 쓰기 프로세스
+# ---------------------------
+def writer():
+    """표준 입력으로 한 줄에 명령 하나(JSON)를 받아 실행하고 결과를 한 줄로 돌려줌"""
+    import shop_db
+    import shop_sync
+
+    for line in sys.stdin:
+        cmd = json.loads(line)
+        op = cmd["op"]
+        result = None
+        if op == "insert":
+            result = shop_db.insert_job(**cmd["job"])
+        elif op == "printed":
+            shop_db.mark_printed(cmd["id"])
+        elif op == "picked_up":
+            shop_db.mark_picked_up(cmd["id"])
+        elif op == "delete":
+            shop_db.delete_job(cmd["id"])
+        elif op == "export":
+            result = shop_sync.export_changeset(cmd["path"])
+        print(json.dumps({"ok": True, "result": result}), flush=True)
+
+
+class Writer:
+    def __init__(self, db_path):
+        env = dict(os.environ, MOM_SHOP_DB=db_path)
+        self.proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--writer"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            cwd=HERE,
+            env=env,
+        )
+
+    def send(self, op, **kwargs):
+        self.proc.stdin.write(json.dumps({"op": op, **kwargs}, ensure_ascii=False) + "\n")
+        self.proc.stdin.flush()
+        line = self.proc.stdout.readline()
+        if not line:
+            raise RuntimeError(f"쓰기 프로세스가 멈췄습니다 ({op})")
+        return json.loads(line)["result"]
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait(timeout=30)
+
+
+# ---------------------------
+# 읽기 쪽 확인
+# ---------------------------
+def check_step(shop_db, label, expect_open, expect_rows, expect_unprinted=None):
+    """
+    expect_open: 찾는 날 PICKUP 에 보여야 하는 안 찾아간 옷 id
+    expect_rows: 오늘 맡긴 옷 id (load_jobs_cached), {id: printed_count} 면 출력 횟수까지 확인
+    """
+    before = check_step.generation
+    generation = shop_db.data_generation()
+    assert generation != before, f"{label}: data_generation 이 그대로 ({generation})"
+    check_step.generation = generation
+
+    open_ids = {r["id"] for r in shop_db.open_jobs_by_pickup(PICKUP)}
+    assert open_ids == set(expect_open), f"{label}: 안 찾아간 옷 {open_ids} != {set(expect_open)}"
+
+    df = shop_db.load_jobs_cached(DROPOFF, DROPOFF)
+    rows = dict(zip(df["id"], df["printed_count"]))
+    assert set(rows) == set(expect_rows), f"{label}: 기간 조회 {set(rows)} != {set(expect_rows)}"
+    if isinstance(expect_rows, dict):
+        assert rows == expect_rows, f"{label}: 출력 횟수 {rows} != {expect_rows}"
+
+    if expect_unprinted is not None:
+        unprinted = {r["id"] for r in shop_db.open_jobs_unprinted()}
+        assert unprinted == set(expect_unprinted), (
+            f"{label}: 미출력 {unprinted} != {set(expect_unprinted)}"
+        )
+    print(f"ok  {label}")
+
+
+check_step.generation = None
+
+
+def main():
+    work = tempfile.mkdtemp(prefix="coherence_test_")
+    db_path = os.path.join(work, "coherence.db")
+    # shop_db 를 import 하기 전에 DB 경로를 정해야 함
+    os.environ["MOM_SHOP_DB"] = db_path
+    sys.path.insert(0, HERE)
+    import shop_db
+    import shop_sync
+
+    shop_db.init_db()
+    shop_sync.set_store_id("테스트")
+    first = shop_db.insert_job(**new_job("읽기쪽"))
+
+    # 색인 / 월 캐시를 먼저 채워 둠 (다른 프로세스 저장을 알아채야 하는 상태)
+    check_step.generation = shop_db.data_generation()
+    assert {r["id"] for r in shop_db.open_jobs_by_pickup(PICKUP)} == {first}
+    assert list(shop_db.load_jobs_cached(DROPOFF, DROPOFF)["id"]) == [first]
+
+    writer_proc = Writer(db_path)
+    try:
+        a = writer_proc.send("insert", job=new_job("손님A"))
+        check_step(shop_db, "다른 프로세스 저장", [first, a], [first, a], [first, a])
+
+        b = writer_proc.send("insert", job=new_job("손님B", 8000))
+        check_step(shop_db, "한 번 더 저장", [first, a, b], [first, a, b])
+
+        writer_proc.send("printed", id=a)
+        check_step(shop_db, "출력 표시", [first, a, b], {first: 0, a: 1, b: 0}, [first, b])
+
+        writer_proc.send("picked_up", id=b)
+        check_step(shop_db, "찾음 표시", [first, a], [first, a, b], [first])
+
+        writer_proc.send("delete", id=first)
+        check_step(shop_db, "삭제", [a], [a, b], [])
+
+        # 내보내기가 change_log 를 지움 → 감시 쪽은 빈 구간을 보고 색인을 다시 읽어야 함
+        writer_proc.send("export", path=os.path.join(work, "changes.json.gz"))
+        c = writer_proc.send("insert", job=new_job("손님C"))
+        writer_proc.send("export", path=os.path.join(work, "changes2.json.gz"))
+        check_step(shop_db, "change_log 정리 뒤 저장", [a, c], [a, b, c], [c])
+
+        writer_proc.send("picked_up", id=a)
+        writer_proc.send("delete", id=c)
+        check_step(shop_db, "정리 뒤 찾음 + 삭제", [], [a, b], [])
+    finally:
+        writer_proc.close()
+
+    print(f"감시 연결이 다른 프로세스 저장을 {shop_db.data_version_watcher.changes}번 반영함")
+
+
+if __name__ == "__main__":
+    if "--writer" in sys.argv:
+        sys.path.insert(0, HERE)
+        writer()
+    else:
+        main()
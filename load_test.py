@@ -0,0 +1,258 @@
+"""
+동시 접속 부하 테스트.
+
+    python load_test.py --sessions 4 --seconds 30
+
+계산대 PC / 태블릿 / 사장님 휴대폰처럼 여러 브라우저 세션이 동시에 앱을 쓰는 상황을
+Streamlit AppTest 로 흉내 낸다. 합성 DB 를 만든 뒤 세션마다 프로세스 하나씩 띄워서
+대시보드 보기 / 매출 입력 저장 / 전표 출력 표시 / 찾음 표시를 섞어서 반복하고,
+처리량 / 지연시간 백분위 / DB 잠김(database is locked) 오류 수를 출력한다.
+
+AppTest 는 한 프로세스 안에서 여러 개를 동시에 돌리면 안전하지 않아서
+세션마다 별도 프로세스를 쓴다. (같은 DB 파일을 여러 프로세스가 함께 씀)
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import multiprocessing
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mom_shop.py")
+
+# (동작 이름, 비율)
+ACTION_MIX = [
+    ("dashboard", 50),
+    ("input_save", 20),
+    ("mark_printed", 15),
+    ("mark_picked_up", 15),
+]
+
+ITEMS = ["바지", "치마", "원피스", "외투/코트", "패딩", "셔츠/블라우스"]
+PAYMENTS = ["카드", "현금", "계좌이체"]
+
+
+# ---------------------------
+# 합성 DB
+# ---------------------------
+def build_database(path, n_jobs, seed=0):
+    import shop_db
+
+    rnd = random.Random(seed)
+    today = date.today()
+
+    shop_db.init_db()
+
+    jobs = []
+    for _ in range(n_jobs):
+        dropoff = today - timedelta(days=int(rnd.expovariate(1 / 120)))
+        pickup = dropoff + timedelta(days=rnd.randint(1, 7))
+        jobs.append(
+            {
+                "dropoff_date": dropoff.strftime("%Y-%m-%d"),
+                "customer_name": f"고객{rnd.randint(1, n_jobs // 3 + 1)}",
+                "customer_phone": f"010{rnd.randint(10000000, 99999999)}",
+                "item_type": rnd.choice(ITEMS),
+                "work_hem": rnd.randint(0, 1),
+                "work_sleeve": rnd.randint(0, 1),
+                "work_width": rnd.randint(0, 1),
+                "work_other": "",
+                "price": rnd.choice([4000, 5000, 8000, 10000, 15000]),
+                "payment_method": rnd.choice(PAYMENTS),
+                "is_prepaid": 1 if rnd.random() < 0.8 else 0,
+                "pickup_date": pickup.strftime("%Y-%m-%d"),
+                "memo": "",
+            }
+        )
+    shop_db.insert_jobs(jobs)
+
+    # 지난 건은 대부분 찾아가고 출력도 했다고 처리
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute(
+            "UPDATE job_rows SET picked_up = 1, printed_count = 1 WHERE pickup_date < ?",
+            (today.strftime("%Y-%m-%d"),),
+        )
+    conn.close()
+
+
+# ---------------------------
+# 세션 하나
+# ---------------------------
+class Session:
+    def __init__(self, name, rnd, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.name = name
+        self.rnd = rnd
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+
+    def run(self):
+        self.at.run()
+        errors = [str(e.value) for e in self.at.exception]
+        return errors
+
+    def login(self):
+        self.run()
+        self.at.text_input[0].input("1234")
+        self.at.button[0].click()
+        return self.run()
+
+    def goto(self, menu):
+        self.at.radio[0].set_value(menu)
+        return self.run()
+
+    def dashboard(self):
+        return self.goto("대시보드")
+
+    def input_save(self):
+        errors = self.goto("매출 입력하기")
+        if errors:
+            return errors
+        self.at.text_input[1].input(f"부하{self.rnd.randint(1, 9999)}")
+        self.at.text_input[2].input(f"010{self.rnd.randint(10000000, 99999999)}")
+        save = next(b for b in self.at.button if b.label == "✅ 이 옷 저장하기")
+        save.click()
+        return self.run()
+
+    def mark_printed(self):
+        errors = self.goto("전표 출력")
+        if errors:
+            return errors
+        buttons = [b for b in self.at.button if (b.key or "").startswith("new_print_")]
+        if not buttons:
+            return []
+        self.rnd.choice(buttons).click()
+        return self.run()
+
+    def mark_picked_up(self):
+        errors = self.goto("대시보드")
+        if errors:
+            return errors
+        boxes = [c for c in self.at.checkbox if (c.key or "").startswith("pickup_")]
+        if not boxes:
+            return []
+        self.rnd.choice(boxes).check()
+        return self.run()
+
+
+def session_worker(index, args, deadline, queue):
+    rnd = random.Random(args.seed + index + 1)
+    latency = defaultdict(list)
+    locked = 0
+    errors = []
+
+    actions = [name for name, _ in ACTION_MIX]
+    weights = [w for _, w in ACTION_MIX]
+
+    session = Session(f"s{index}", rnd, args.timeout)
+    errors.extend(session.login())
+    if errors:
+        queue.put({"latency": {}, "locked": 0, "errors": errors})
+        return
+
+    while time.time() < deadline:
+        action = rnd.choices(actions, weights)[0]
+        t0 = time.perf_counter()
+        try:
+            action_errors = getattr(session, action)()
+        except Exception as e:  # AppTest 자체가 시간 초과 등으로 실패한 경우
+            action_errors = [repr(e)]
+        latency[action].append(time.perf_counter() - t0)
+
+        for err in action_errors:
+            if "database is locked" in err:
+                locked += 1
+            else:
+                errors.append(err)
+
+    queue.put({"latency": dict(latency), "locked": locked, "errors": errors})
+
+
+# ---------------------------
+# 보고
+# ---------------------------
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, int(round(p / 100 * (len(values) - 1)))))
+    return values[k]
+
+
+def report(results, elapsed, sessions):
+    latency = results["latency"]
+    all_times = [t for times in latency.values() for t in times]
+
+    print(f"\n세션 {sessions}개 / {elapsed:.1f}초")
+    print(f"처리량: {len(all_times) / elapsed:.2f} 동작/초 (총 {len(all_times)} 회)")
+    print(f"DB 잠김 오류: {results['locked']} 회 / 기타 오류: {len(results['errors'])} 회")
+    print()
+    print(f"{'동작':16s} {'횟수':>6s} {'p50(ms)':>9s} {'p90(ms)':>9s} {'p99(ms)':>9s} {'최대(ms)':>9s}")
+    for name, times in sorted(latency.items()) + [("전체", all_times)]:
+        print(
+            f"{name:16s} {len(times):6d}"
+            f" {percentile(times, 50) * 1000:9.1f}"
+            f" {percentile(times, 90) * 1000:9.1f}"
+            f" {percentile(times, 99) * 1000:9.1f}"
+            f" {max(times, default=0) * 1000:9.1f}"
+        )
+    for err in results["errors"][:5]:
+        print(f"- 오류 예: {err[:200]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="동시 접속 부하 테스트")
+    parser.add_argument("--sessions", type=int, default=4, help="동시 세션 수")
+    parser.add_argument("--seconds", type=float, default=30, help="테스트 시간(초)")
+    parser.add_argument("--jobs", type=int, default=5000, help="합성 DB 건수")
+    parser.add_argument("--db", default=None, help="합성 DB 경로 (기본: 임시 파일)")
+    parser.add_argument(
+        "--overwrite", action="store_true", help="--db 파일이 이미 있으면 지우고 새로 만듦"
+    )
+    parser.add_argument("--timeout", type=float, default=30, help="화면 한 번 그리는 최대 시간(초)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), "load_test.db")
+    if os.path.exists(db_path):
+        # 가게 DB(mom_shop.db)를 잘못 가리켜서 지우는 일이 없게 - 직접 지우라고 한 경우만
+        if not args.overwrite:
+            parser.error(f"{db_path} 가 이미 있습니다. 지우고 새로 만들려면 --overwrite 를 붙이세요.")
+        os.remove(db_path)
+    # shop_db 를 import 하기 전에 DB 경로를 정해야 함
+    os.environ["MOM_SHOP_DB"] = db_path
+    sys.path.insert(0, os.path.dirname(APP_PATH))
+
+    print(f"합성 DB 만드는 중: {db_path} ({args.jobs} 건)")
+    build_database(db_path, args.jobs, args.seed)
+
+    queue = multiprocessing.Queue()
+    start = time.time()
+    deadline = start + args.seconds
+    workers = [
+        multiprocessing.Process(target=session_worker, args=(i, args, deadline, queue))
+        for i in range(args.sessions)
+    ]
+    for w in workers:
+        w.start()
+
+    results = {"latency": defaultdict(list), "locked": 0, "errors": []}
+    for _ in workers:
+        part = queue.get()
+        for action, times in part["latency"].items():
+            results["latency"][action].extend(times)
+        results["locked"] += part["locked"]
+        results["errors"].extend(part["errors"])
+    for w in workers:
+        w.join()
+
+    report(results, time.time() - start, args.sessions)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,332 +1,51 @@
-import sqlite3
+import time
+
 import pandas as pd
 import streamlit as st
-from datetime import datetime, date, timedelta
-
-DB_PATH = "mom_shop.db"
+from datetime import date, timedelta
+
+import shop_analytics
+import shop_maintenance
+import shop_printer
+import shop_warmup
+
+from shop_db import (
+    AGING_BUCKETS,
+    JOB_COLUMNS,
+    build_receipt_text,
+    cancel_prefetch,
+    close_day,
+    data_generation,
+    delete_job,
+    format_phone,
+    init_db,
+    insert_job,
+    insert_jobs,
+    job_tasks,
+    load_closing_day,
+    load_closing_detail,
+    load_closing_summary,
+    load_daily_trend,
+    load_day_totals,
+    load_jobs_cached,
+    load_month_to_date,
+    load_overdue_jobs,
+    load_payment_trend,
+    load_pickup_calendar,
+    load_stale_closings,
+    load_unpaid_jobs,
+    mark_picked_up,
+    mark_printed,
+    open_jobs_by_pickup,
+    open_jobs_unprinted,
+    suggest_price,
+    update_job,
+    work_flags,
+)
 
 # 🔐 관리자 비밀번호
 ADMIN_PASSWORD = "1234"
 
-
-# ---------------------------
-# 연락처 포맷팅 함수
-# ---------------------------
-def format_phone(raw):
-    """
-    문자열에서 숫자만 뽑아서 휴대폰/전화번호 형태로 포맷팅.
-    기본적으로 010 번호를 우선 가정.
-    """
-    if raw is None:
-        return ""
-
-    digits = "".join(ch for ch in str(raw) if ch.isdigit())
-
-    if not digits:
-        return ""
-
-    # 8자리만 입력한 경우 → 010-xxxx-xxxx 로 간주
-    if len(digits) == 8:
-        return f"010-{digits[:4]}-{digits[4:]}"
-
-    # 11자리, 010으로 시작
-    if len(digits) == 11 and digits.startswith("010"):
-        return f"{digits[:3]}-{digits[3:7]}-{digits[7:]}"
-
-    # 10자리, 0으로 시작 (지역번호 포함)
-    if len(digits) == 10 and digits.startswith("0"):
-        if digits.startswith("02"):
-            return f"{digits[:2]}-{digits[2:6]}-{digits[6:]}"
-        else:
-            return f"{digits[:3]}-{digits[3:6]}-{digits[6:]}"
-
-    # 기타 11자리
-    if len(digits) == 11:
-        return f"{digits[:3]}-{digits[3:7]}-{digits[7:]}"
-
-    # 그 외는 그냥 숫자 그대로
-    return digits
-
-
-# ---------------------------
-# DB 초기화
-# ---------------------------
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-
-    # 기본 테이블 생성 (printed_count 포함)
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS jobs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            dropoff_date TEXT NOT NULL,
-            customer_name TEXT,
-            customer_phone TEXT,
-            item_type TEXT NOT NULL,
-            work_hem INTEGER NOT NULL DEFAULT 0,
-            work_sleeve INTEGER NOT NULL DEFAULT 0,
-            work_width INTEGER NOT NULL DEFAULT 0,
-            work_other TEXT,
-            price INTEGER NOT NULL,
-            payment_method TEXT NOT NULL,
-            is_prepaid INTEGER NOT NULL DEFAULT 1,
-            pickup_date TEXT,
-            picked_up INTEGER NOT NULL DEFAULT 0,
-            memo TEXT,
-            printed_count INTEGER NOT NULL DEFAULT 0,
-            created_at TEXT NOT NULL
-        )
-        """
-    )
-
-    # 기존 DB에 printed_count 컬럼이 없으면 추가
-    cur.execute("PRAGMA table_info(jobs)")
-    cols = [row[1] for row in cur.fetchall()]
-    if "printed_count" not in cols:
-        cur.execute(
-            "ALTER TABLE jobs ADD COLUMN printed_count INTEGER NOT NULL DEFAULT 0"
-        )
-
-    conn.commit()
-    conn.close()
-
-
-def insert_job(
-    dropoff_date,
-    customer_name,
-    customer_phone,
-    item_type,
-    work_hem,
-    work_sleeve,
-    work_width,
-    work_other,
-    price,
-    payment_method,
-    is_prepaid,
-    pickup_date,
-    memo,
-):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    phone_formatted = format_phone(customer_phone)
-    cur.execute(
-        """
-        INSERT INTO jobs (
-            dropoff_date, customer_name, customer_phone,
-            item_type, work_hem, work_sleeve, work_width, work_other,
-            price, payment_method, is_prepaid, pickup_date,
-            picked_up, memo, printed_count, created_at
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?)
-        """,
-        (
-            dropoff_date,
-            customer_name,
-            phone_formatted,
-            item_type,
-            work_hem,
-            work_sleeve,
-            work_width,
-            work_other,
-            price,
-            payment_method,
-            is_prepaid,
-            pickup_date,
-            0,
-            memo,
-            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        ),
-    )
-    job_id = cur.lastrowid
-    conn.commit()
-    conn.close()
-    return job_id
-
-
-def update_job(
-    job_id,
-    dropoff_date,
-    customer_name,
-    customer_phone,
-    item_type,
-    work_hem,
-    work_sleeve,
-    work_width,
-    work_other,
-    price,
-    payment_method,
-    is_prepaid,
-    pickup_date,
-    picked_up,
-    memo,
-):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    phone_formatted = format_phone(customer_phone)
-    cur.execute(
-        """
-        UPDATE jobs SET
-            dropoff_date = ?,
-            customer_name = ?,
-            customer_phone = ?,
-            item_type = ?,
-            work_hem = ?,
-            work_sleeve = ?,
-            work_width = ?,
-            work_other = ?,
-            price = ?,
-            payment_method = ?,
-            is_prepaid = ?,
-            pickup_date = ?,
-            picked_up = ?,
-            memo = ?
-        WHERE id = ?
-        """,
-        (
-            dropoff_date,
-            customer_name,
-            phone_formatted,
-            item_type,
-            work_hem,
-            work_sleeve,
-            work_width,
-            work_other,
-            price,
-            payment_method,
-            is_prepaid,
-            pickup_date,
-            picked_up,
-            memo,
-            job_id,
-        ),
-    )
-    conn.commit()
-    conn.close()
-
-
-def delete_job(job_id):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
-    conn.commit()
-    conn.close()
-
-
-def load_jobs(start_date=None, end_date=None):
-    conn = sqlite3.connect(DB_PATH)
-    query = "SELECT * FROM jobs"
-    params = []
-
-    if start_date and end_date:
-        query += " WHERE dropoff_date BETWEEN ? AND ?"
-        params = [start_date, end_date]
-
-    query += " ORDER BY dropoff_date DESC, id DESC"
-    df = pd.read_sql_query(query, conn, params=params)
-    conn.close()
-
-    if "printed_count" not in df.columns:
-        df["printed_count"] = 0
-
-    return df
-
-
-def load_jobs_by_pickup(target_date):
-    conn = sqlite3.connect(DB_PATH)
-    query = """
-        SELECT * FROM jobs
-        WHERE pickup_date = ? AND picked_up = 0
-        ORDER BY dropoff_date ASC, id ASC
-    """
-    df = pd.read_sql_query(query, conn, params=[target_date])
-    conn.close()
-    if "printed_count" not in df.columns:
-        df["printed_count"] = 0
-    return df
-
-
-def load_job_by_id(job_id):
-    conn = sqlite3.connect(DB_PATH)
-    df = pd.read_sql_query("SELECT * FROM jobs WHERE id = ?", conn, params=[job_id])
-    conn.close()
-    if df.empty:
-        return None
-    if "printed_count" not in df.columns:
-        df["printed_count"] = 0
-    return df.iloc[0]
-
-
-def mark_picked_up(job_id):
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("UPDATE jobs SET picked_up = 1 WHERE id = ?", (job_id,))
-    conn.commit()
-    conn.close()
-
-
-def mark_printed(job_id):
-    """전표를 출력했다고 표시 (printed_count + 1)"""
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute(
-        "UPDATE jobs SET printed_count = COALESCE(printed_count,0) + 1 WHERE id = ?",
-        (job_id,),
-    )
-    conn.commit()
-    conn.close()
-
-
-# ---------------------------
-# 전표 텍스트 생성 공통 함수
-# ---------------------------
-def build_receipt_text(row):
-    tasks = []
-    if row["work_hem"]:
-        tasks.append("기장")
-    if row["work_sleeve"]:
-        tasks.append("소매")
-    if row["work_width"]:
-        tasks.append("품")
-    if row["work_other"]:
-        tasks.append(row["work_other"])
-
-    task_text = ", ".join(tasks) if tasks else "없음"
-    payment_status = "결제 완료" if row["is_prepaid"] == 1 else "미결제"
-
-    dropoff = row["dropoff_date"] or ""
-    pickup = row["pickup_date"] or ""
-    name = row["customer_name"] or ""
-    phone = row["customer_phone"] or ""
-    item = row["item_type"] or ""
-    pay_method = row["payment_method"] or ""
-    price = int(row["price"]) if row["price"] is not None else 0
-    job_id = row["id"]
-
-    text = f"""────────────────────────
-        에벤에셀옷수선
-────────────────────────
-고객명: {name}
-연락처: {phone}
-
-맡긴날: {dropoff}
-찾는날: {pickup}
-
-종류: {item}
-작업: {task_text}
-
-결제 여부: {payment_status}
-결제수단: {pay_method}
-
-금액: {price:,}원
-번호(ID): #{job_id}
-────────────────────────
-        내부 보관용
-────────────────────────
-"""
-    return text
-
-
 # ---------------------------
 # 관리자 로그인 처리
 # ---------------------------
@@ -350,12 +69,72 @@ def admin_login():
         st.caption("ℹ️ 관리자 비밀번호를 입력하지 않으면 조회만 가능합니다.")
 
 
+# ---------------------------
+# 서버 시작 준비 (서버 프로세스당 한 번)
+# ---------------------------
+@st.cache_resource
+def warm_start():
+    """
+    DB 를 준비하고, 첫 화면이 그려지는 동안 백그라운드에서 캐시 / 자주 보는 페이지를 데움.
+    화면 그리는 시간 기록(LatencyLog)을 돌려준다.
+    """
+    init_db()
+    shop_warmup.start_warm_up()
+    return shop_warmup.LatencyLog()
+
+
+# ---------------------------
+# DB 정기 점검 (서버 프로세스당 하나)
+# ---------------------------
+@st.cache_resource
+def maintenance_scheduler():
+    return shop_maintenance.start_scheduler()
+
+
+# ---------------------------
+# 영수증 프린터 출력 대기열 (서버 프로세스당 하나)
+# ---------------------------
+@st.cache_resource
+def print_spooler():
+    return shop_printer.start_spooler()
+
+
+def show_spooler_status():
+    spooler = print_spooler()
+    stats = spooler.stats()
+    with st.expander(
+        f"🖨️ 영수증 프린터 ({stats['sink']}) - 대기 {stats['queued'] + stats['sending']}건",
+        expanded=bool(stats["failed"]),
+    ):
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("대기", stats["queued"] + stats["sending"])
+        with col2:
+            st.metric("출력 완료", stats["done"])
+        with col3:
+            st.metric("실패", stats["failed"])
+        with col4:
+            st.metric("분당 출력", f"{stats['per_minute']:.1f}")
+        st.caption(
+            f"이번 서버 실행 후 {stats['sent']}장 / 평균 {stats['avg_ms']:.0f}ms / 재시도 {stats['failures']}회"
+        )
+        failed = shop_printer.load_failed_prints()
+        if failed:
+            st.dataframe(pd.DataFrame(failed), use_container_width=True)
+            if st.button("🔁 실패한 전표 다시 보내기"):
+                shop_printer.retry_failed()
+                st.rerun()
+
+
 # ---------------------------
 # 메인
 # ---------------------------
 def main():
+    t0 = time.perf_counter()
     st.set_page_config(page_title="에벤에셀옷수선 매출장", layout="centered")
-    init_db()
+    latency = warm_start()
+    maintenance_scheduler()
+    shop_maintenance.touch()
 
     st.title("👗 에벤에셀옷수선 매출장")
 
@@ -365,23 +144,37 @@ def main():
     if is_admin:
         menu_options = [
             "대시보드",
+            "찾는 날 달력",
             "매출 입력하기",
             "전표 출력",
             "매출 내역 보기",
             "데이터 수정",
+            "안 찾아간 옷",
+            "미수금",
+            "일일 마감",
             "월별 합계 보기",
+            "매출 추세",
+            "DB 관리",
         ]
     else:
         menu_options = [
             "대시보드",
+            "찾는 날 달력",
             "매출 내역 보기",
             "월별 합계 보기",
+            "매출 추세",
         ]
 
     menu = st.radio("메뉴 선택", menu_options, horizontal=True)
 
+    # 기간 조회 화면을 떠나면 이웃 달 미리 읽기는 그만둠
+    if menu not in ("전표 출력", "매출 내역 보기", "데이터 수정"):
+        cancel_prefetch()
+
     if menu == "대시보드":
         page_dashboard()
+    elif menu == "찾는 날 달력":
+        page_pickup_calendar()
     elif menu == "매출 입력하기":
         page_input()
     elif menu == "전표 출력":
@@ -390,13 +183,55 @@ def main():
         page_list()
     elif menu == "데이터 수정":
         page_edit()
+    elif menu == "안 찾아간 옷":
+        page_overdue()
+    elif menu == "미수금":
+        page_receivables()
+    elif menu == "일일 마감":
+        page_closing()
+    elif menu == "매출 추세":
+        page_trends()
+    elif menu == "DB 관리":
+        page_maintenance()
     else:
         page_monthly_summary()
 
+    latency.record(menu, time.perf_counter() - t0)
+
 
 # ---------------------------
 # 대시보드
 # ---------------------------
+def job_card_markdown(row, status=None):
+    """대시보드에 보여 줄 옷 한 벌 (관리자 / 보기 전용 화면 공용)"""
+    tasks = job_tasks(row)
+    card = (
+        f"**[{row['id']}] {row['customer_name'] or '이름 없음'}**  \n"
+        f"- 연락처: {row['customer_phone'] or '없음'}  \n"
+        f"- 맡긴 날: {row['dropoff_date']}  \n"
+        f"- 옷 종류: {row['item_type']}  \n"
+        f"- 작업: {', '.join(tasks) if tasks else '기록 없음'}  \n"
+        f"- 금액: {int(row['price']):,}원 | 결제: {row['payment_method']}"
+    )
+    if status:
+        card += f"  \n- 상태: {status}"
+    return card
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def dashboard_view(target_str, generation):
+    """
+    찾는 날 하나의 (고객 수, 옷 개수, 보기 전용 목록 Markdown).
+    모든 세션이 같이 쓰고, generation(data_generation) 이 바뀌면 새로 만든다.
+    """
+    rows = open_jobs_by_pickup(target_str)
+    customer_count = len(
+        {(row["customer_name"] or "", row["customer_phone"] or "") for row in rows}
+    )
+    markdown = "\n\n".join(job_card_markdown(row, "아직 찾아가지 않음") for row in rows)
+    return customer_count, len(rows), markdown
+
+
 def page_dashboard():
     st.header("📊 찾으러 올 고객 대시보드")
 
@@ -404,79 +239,100 @@ def page_dashboard():
     target_date = st.date_input("찾으러 올 날짜 선택", value=today)
     target_str = target_date.strftime("%Y-%m-%d")
 
-    df = load_jobs_by_pickup(target_str)
+    # 안 찾아간 옷은 프로세스 공용 메모리 색인에서 읽고, 화면 글은 저장이 있을 때만 새로 만듦
+    customer_count, garment_count, markdown = dashboard_view(target_str, data_generation())
 
-    if df.empty:
+    if not garment_count:
         st.info(f"{target_str} 기준으로 찾으러 올 옷이 없습니다.")
         return
 
-    df["customer_key"] = (
-        df["customer_name"].fillna("").astype(str)
-        + "|"
-        + df["customer_phone"].fillna("").astype(str)
-    )
-    customer_count = df["customer_key"].nunique()
-
     st.subheader(f"👥 고객 수: {customer_count} 명")
-    st.subheader(f"👗 옷 개수: {len(df)} 벌")
+    st.subheader(f"👗 옷 개수: {garment_count} 벌")
 
     st.markdown("---")
     st.markdown(f"### 🔽 {target_str} 에 찾으러 올 옷 리스트")
 
-    is_admin = st.session_state.get("is_admin", False)
+    if not st.session_state.get("is_admin", False):
+        # 보기 전용: 목록 전체가 Markdown 한 덩어리
+        st.markdown(markdown)
+        return
 
-    for _, row in df.iterrows():
-        if is_admin:
-            col1, col2 = st.columns([1, 4])
-            with col1:
-                checked = st.checkbox("찾음", key=f"pickup_{row['id']}")
-            with col2:
-                tasks = []
-                if row["work_hem"]:
-                    tasks.append("기장")
-                if row["work_sleeve"]:
-                    tasks.append("소매")
-                if row["work_width"]:
-                    tasks.append("품")
-                if row["work_other"]:
-                    tasks.append(row["work_other"])
+    for row in open_jobs_by_pickup(target_str):
+        col1, col2 = st.columns([1, 4])
+        with col1:
+            checked = st.checkbox("찾음", key=f"pickup_{row['id']}")
+        with col2:
+            st.markdown(job_card_markdown(row))
 
-                st.markdown(
-                    f"""
-**[{row['id']}] {row['customer_name'] or '이름 없음'}**  
-- 연락처: {row['customer_phone'] or '없음'}  
-- 맡긴 날: {row['dropoff_date']}  
-- 옷 종류: {row['item_type']}  
-- 작업: {", ".join(tasks) if tasks else "기록 없음"}  
-- 금액: {int(row['price']):,}원 | 결제: {row['payment_method']}
-"""
-                )
+        if checked:
+            mark_picked_up(row["id"])
+            st.rerun()
 
-            if checked:
-                mark_picked_up(row["id"])
-                st.rerun()
-        else:
-            tasks = []
-            if row["work_hem"]:
-                tasks.append("기장")
-            if row["work_sleeve"]:
-                tasks.append("소매")
-            if row["work_width"]:
-                tasks.append("품")
-            if row["work_other"]:
-                tasks.append(row["work_other"])
 
-            st.markdown(
-                f"""
-**[{row['id']}] {row['customer_name'] or '이름 없음'}**  
-- 연락처: {row['customer_phone'] or '없음'}  
-- 맡긴 날: {row['dropoff_date']}  
-- 옷 종류: {row['item_type']}  
-- 작업: {", ".join(tasks) if tasks else "기록 없음"}  
-- 금액: {int(row['price']):,}원 | 결제: {row['payment_method']}  
-- 상태: 아직 찾아가지 않음
-"""
-            )
+# ---------------------------
+# 찾는 날 달력 (작업량 미리보기)
+# ---------------------------
+def page_pickup_calendar():
+    st.header("📅 찾는 날 달력")
+
+    today = date.today()
+    col1, col2 = st.columns(2)
+    with col1:
+        start_date = st.date_input("시작 날짜", value=today, key="calendar_start")
+    with col2:
+        days = st.radio("기간", [7, 14, 30], index=2, horizontal=True, format_func=lambda d: f"{d}일")
+
+    end_date = start_date + timedelta(days=days - 1)
+    start_str = start_date.strftime("%Y-%m-%d")
+    end_str = end_date.strftime("%Y-%m-%d")
+
+    df = load_pickup_calendar(start_str, end_str)
+
+    if df.empty:
+        st.info(f"{start_str} ~ {end_str} 기간에 찾으러 올 옷이 없습니다.")
+        return
+
+    st.subheader(f"👗 옷 개수: {int(df['garments'].sum())} 벌")
+    st.caption("※ 고객 수는 날짜별 고객 수입니다. (같은 고객이 여러 날에 찾으러 오면 날마다 따로 셉니다)")
+
+    # 주 단위 달력 (월~일)
+    weekday_names = ["월", "화", "수", "목", "금", "토", "일"]
+    cal = df.copy()
+    cal["day"] = pd.to_datetime(cal["pickup_date"])
+    cal["week_start"] = cal["day"] - pd.to_timedelta(cal["day"].dt.weekday, unit="D")
+    cal["weekday"] = cal["day"].dt.weekday.map(lambda i: weekday_names[i])
+    cal["cell"] = (
+        cal["day"].dt.strftime("%d일 ")
+        + cal["garments"].astype(str)
+        + "벌/"
+        + cal["customers"].astype(str)
+        + "명"
+    )
+    # 실제 날짜로 묶어서 정렬한 뒤 이름을 붙임 (글자로 정렬하면 해가 바뀔 때 1월이 12월보다 앞에 옴)
+    grid = (
+        cal.pivot(index="week_start", columns="weekday", values="cell")
+        .sort_index()
+        .reindex(columns=weekday_names)
+        .fillna("")
+    )
+    grid.index = grid.index.strftime("%m/%d 주")
+    grid.index.name = "week_start"
+    st.markdown("#### 🗓️ 주간 달력")
+    st.dataframe(grid, use_container_width=True)
+
+    st.markdown("#### 📋 날짜별 작업량")
+    df_display = df.rename(
+        columns={
+            "pickup_date": "찾는날",
+            "garments": "옷개수",
+            "customers": "고객수",
+            "work_hem": "기장",
+            "work_sleeve": "소매",
+            "work_width": "품",
+            "work_other": "기타",
+        }
+    )
+    st.dataframe(df_display, use_container_width=True)
 
 
 # ---------------------------
@@ -499,6 +355,8 @@ def page_input():
         st.session_state.last_pickup_date = date.today() + timedelta(days=3)
     if "current_price" not in st.session_state:
         st.session_state.current_price = 4000
+    if "order_items" not in st.session_state:
+        st.session_state.order_items = []
 
     st.markdown("#### 0. 고객 정보")
     col1, col2 = st.columns(2)
@@ -553,6 +411,14 @@ def page_input():
 
     st.markdown("#### 3. 금액 / 결제 정보")
 
+    # 옷 종류 / 작업 조합이 바뀌면 지난 기록의 보통 가격(중앙값)으로 금액을 맞춰 줌
+    suggestion = suggest_price(item_type, work_hem, work_sleeve, work_width)
+    price_key = (item_type, work_flags(work_hem, work_sleeve, work_width))
+    if st.session_state.get("price_key") != price_key:
+        st.session_state.price_key = price_key
+        if suggestion:
+            st.session_state.current_price = suggestion["p50"]
+
     price = st.number_input(
         "금액(원)",
         min_value=0,
@@ -560,24 +426,19 @@ def page_input():
         value=st.session_state.current_price,
         format="%d",
     )
+    if suggestion:
+        st.caption(
+            f"💡 보통 가격: {suggestion['p50']:,}원 "
+            f"(대부분 {suggestion['p25']:,}~{suggestion['p75']:,}원, 지난 {suggestion['n']}건 기준)"
+        )
 
+    # 버튼 콜백에서 금액을 올리면 그 다음 실행 한 번으로 바로 반영됨 (st.rerun 불필요)
     col_p1, col_p2, col_p3, col_p4 = st.columns(4)
-    with col_p1:
-        if st.button("+1,000원"):
-            st.session_state.current_price += 1000
-            st.rerun()
-    with col_p2:
-        if st.button("+5,000원"):
-            st.session_state.current_price += 5000
-            st.rerun()
-    with col_p3:
-        if st.button("+10,000원"):
-            st.session_state.current_price += 10000
-            st.rerun()
-    with col_p4:
-        if st.button("+50,000원"):
-            st.session_state.current_price += 50000
-            st.rerun()
+    for col, amount in zip(
+        (col_p1, col_p2, col_p3, col_p4), (1000, 5000, 10000, 50000)
+    ):
+        with col:
+            st.button(f"+{amount:,}원", on_click=add_current_price, args=(amount,))
 
     st.session_state.current_price = price
 
@@ -597,32 +458,69 @@ def page_input():
 
     st.markdown("---")
 
-    col_s1, col_s2 = st.columns(2)
+    col_s1, col_s2, col_s3 = st.columns(3)
     with col_s1:
         save = st.button("✅ 이 옷 저장하기", use_container_width=True)
     with col_s2:
+        add_to_order = st.button("🧺 주문에 담기", use_container_width=True)
+    with col_s3:
         same_customer = st.checkbox("같은 고객 이어서 입력")
 
-    if save:
-        dropoff_str = dropoff_date_input.strftime("%Y-%m-%d")
-        pickup_str = pickup_date_input.strftime("%Y-%m-%d")
-
-        job_id = insert_job(
-            dropoff_str,
-            customer_name,
-            customer_phone,
-            item_type,
-            int(work_hem),
-            int(work_sleeve),
-            int(work_width),
-            work_other,
-            int(price),
-            payment_method,
-            is_prepaid,
-            pickup_str,
-            memo,
+    dropoff_str = dropoff_date_input.strftime("%Y-%m-%d")
+    pickup_str = pickup_date_input.strftime("%Y-%m-%d")
+
+    garment = {
+        "item_type": item_type,
+        "work_hem": int(work_hem),
+        "work_sleeve": int(work_sleeve),
+        "work_width": int(work_width),
+        "work_other": work_other,
+        "price": int(price),
+        "payment_method": payment_method,
+        "is_prepaid": is_prepaid,
+        "memo": memo,
+    }
+
+    if add_to_order:
+        # 화면만 다시 그리면 되므로 DB 저장 / st.rerun 없이 목록에만 추가
+        st.session_state.order_items.append(garment)
+
+    save_order = False
+    order_items = st.session_state.order_items
+    if order_items:
+        st.markdown(f"#### 🧺 이번 주문에 담은 옷 ({len(order_items)} 벌)")
+        for i, item in enumerate(order_items):
+            col_o1, col_o2 = st.columns([5, 1])
+            with col_o1:
+                st.markdown(
+                    f"{i + 1}. {item['item_type']} / {', '.join(job_tasks(item)) or '없음'} / "
+                    f"{item['price']:,}원 / {item['payment_method']}"
+                )
+            with col_o2:
+                st.button("❌ 빼기", key=f"order_remove_{i}", on_click=remove_order_item, args=(i,))
+
+        total = sum(item["price"] for item in order_items)
+        st.markdown(f"**합계: {total:,}원** (고객 / 맡긴 날 / 찾는 날은 위 입력값으로 같이 저장)")
+        save_order = st.button(
+            f"✅ 담은 옷 {len(order_items)}벌 한 번에 저장하기",
+            use_container_width=True,
+            type="primary",
         )
 
+    if save or save_order:
+        customer = {
+            "dropoff_date": dropoff_str,
+            "customer_name": customer_name,
+            "customer_phone": customer_phone,
+            "pickup_date": pickup_str,
+        }
+
+        if save_order:
+            insert_jobs([{**customer, **item} for item in order_items])
+            st.session_state.order_items = []
+        else:
+            insert_job(**customer, **garment)
+
         st.success("저장되었습니다! 🙆‍♀️")
         st.balloons()
 
@@ -640,12 +538,21 @@ def page_input():
             st.session_state.last_pickup_date = date.today() + timedelta(days=3)
 
         st.session_state.current_price = 4000
+        st.session_state.pop("price_key", None)
 
         # 저장 후에는 전표 출력 탭에서 신규 출력/재출력 관리
         st.info("전표가 필요하면 상단 메뉴의 '전표 출력' 탭에서 신규 출력으로 관리할 수 있습니다.")
         st.rerun()
 
 
+def add_current_price(amount):
+    st.session_state.current_price += amount
+
+
+def remove_order_item(index):
+    st.session_state.order_items.pop(index)
+
+
 # ---------------------------
 # 전표 출력 탭
 # ---------------------------
@@ -656,16 +563,17 @@ def page_print():
         st.warning("관리자 비밀번호를 입력해야 전표 출력 관리를 할 수 있습니다.")
         return
 
+    show_spooler_status()
+
     today = date.today()
     start_date, end_date = st.date_input(
         "기간 선택 (맡긴 날 기준)",
         value=(date(today.year, today.month, 1), today),
     )
 
-    df = load_jobs(
-        start_date.strftime("%Y-%m-%d"),
-        end_date.strftime("%Y-%m-%d"),
-    )
+    start_str = start_date.strftime("%Y-%m-%d")
+    end_str = end_date.strftime("%Y-%m-%d")
+    df = load_jobs_cached(start_str, end_str)
 
     if df.empty:
         st.info("해당 기간에 데이터가 없습니다.")
@@ -674,7 +582,18 @@ def page_print():
     if "printed_count" not in df.columns:
         df["printed_count"] = 0
 
-    new_df = df[df["printed_count"] == 0]
+    # 신규 출력 = 한 번도 출력 안 한 건.
+    # 안 찾아간 옷은 메모리 색인에서, 출력 없이 이미 찾아간 옷은 기간 조회 결과에서 붙임
+    open_new = pd.DataFrame(open_jobs_unprinted(), columns=JOB_COLUMNS)
+    open_new = open_new[
+        (open_new["dropoff_date"] >= start_str) & (open_new["dropoff_date"] <= end_str)
+    ]
+    picked_new = df[(df["printed_count"] == 0) & (df["picked_up"] == 1)]
+    new_df = (
+        pd.concat([open_new, picked_new[list(JOB_COLUMNS)]], ignore_index=True)
+        .drop_duplicates("id")
+        .sort_values(["dropoff_date", "id"], ascending=False)
+    )
     re_df = df[df["printed_count"] > 0]
 
     tab1, tab2 = st.tabs(["🆕 신규 출력(한 번도 출력 안 한 건)", "🔁 재출력(이미 출력된 전표)"])
@@ -690,12 +609,16 @@ def page_print():
                 use_container_width=True,
             )
 
+            if st.button(f"🖨️ 신규 {len(new_df)}건 모두 프린터로 보내기", use_container_width=True):
+                queued = sum(shop_printer.enqueue_receipt(job_id, "new") for job_id in new_df["id"])
+                st.success(f"{queued}건을 프린터 대기열에 넣었습니다. 출력되면 자동으로 '출력 완료'가 됩니다.")
+
             st.markdown("---")
             st.markdown("#### 전표 출력할 건 선택")
 
             # 행마다 '전표 보기 / 출력했다고 표시' 버튼
             for _, row in new_df.iterrows():
-                col1, col2, col3 = st.columns([1, 3, 2])
+                col1, col2, col3, col4 = st.columns([1, 3, 2, 1])
                 with col1:
                     if st.button("🧾 전표 보기", key=f"new_view_{row['id']}"):
                         receipt = build_receipt_text(row)
@@ -712,6 +635,10 @@ def page_print():
                         mark_printed(row["id"])
                         st.success(f"번호 {row['id']} 전표를 '신규 출력 완료'로 기록했습니다.")
                         st.rerun()
+                with col4:
+                    if st.button("🖨️", key=f"new_spool_{row['id']}", help="영수증 프린터로 보내기"):
+                        shop_printer.enqueue_receipt(row["id"], "new")
+                        st.toast(f"번호 {row['id']} 전표를 프린터로 보냈습니다.")
 
     # 재출력 탭
     with tab2:
@@ -730,7 +657,7 @@ def page_print():
             st.markdown("#### 재출력할 건 선택")
 
             for _, row in re_df.iterrows():
-                col1, col2, col3 = st.columns([1, 3, 2])
+                col1, col2, col3, col4 = st.columns([1, 3, 2, 1])
                 with col1:
                     if st.button("🧾 전표 보기", key=f"re_view_{row['id']}"):
                         receipt = build_receipt_text(row)
@@ -747,6 +674,10 @@ def page_print():
                         mark_printed(row["id"])
                         st.success(f"번호 {row['id']} 전표를 '재출력'으로 1회 추가 기록했습니다.")
                         st.rerun()
+                with col4:
+                    if st.button("🖨️", key=f"re_spool_{row['id']}", help="영수증 프린터로 다시 보내기"):
+                        shop_printer.enqueue_receipt(row["id"], "re")
+                        st.toast(f"번호 {row['id']} 전표를 프린터로 보냈습니다.")
 
     # 마지막으로 본 전표 내용 한 번에 보여주기
     if "last_receipt" in st.session_state:
@@ -766,25 +697,18 @@ def page_print():
 # ---------------------------
 # 매출 내역 보기
 # ---------------------------
-def page_list():
-    st.header("📋 매출 내역")
-
-    today = date.today()
-    start_date, end_date = st.date_input(
-        "기간 선택 (맡긴 날 기준)",
-        value=(date(today.year, today.month, 1), today),
-    )
-
-    df = load_jobs(
-        start_date.strftime("%Y-%m-%d"),
-        end_date.strftime("%Y-%m-%d"),
-    )
+@st.cache_data(max_entries=32, show_spinner=False)
+def list_view(start_str, end_str, generation):
+    """
+    매출 내역 화면용 (고객 수, 옷 개수, 매출 합계, 표) - 데이터가 없으면 None.
+    모든 세션이 같이 쓰고, generation(data_generation) 이 바뀌면 새로 만든다.
+    """
+    df = load_jobs_cached(start_str, end_str)
 
     if df.empty:
-        st.info("데이터 없음")
-        return
+        return None
 
-    df["customer_key"] = (
+    customer_key = (
         df["customer_name"].fillna("").astype(str)
         + "|"
         + df["customer_phone"].fillna("").astype(str)
@@ -792,10 +716,6 @@ def page_list():
         + df["dropoff_date"].astype(str)
     )
 
-    st.subheader(f"👥 고객 수: {df['customer_key'].nunique()} 명")
-    st.subheader(f"👗 옷 개수: {len(df)} 벌")
-    st.subheader(f"💰 매출 합계: {int(df['price'].sum()):,} 원")
-
     df_display = df.copy()
     df_display["기장"] = df_display["work_hem"].replace({1: "✓", 0: ""})
     df_display["소매"] = df_display["work_sleeve"].replace({1: "✓", 0: ""})
@@ -820,30 +740,55 @@ def page_list():
         inplace=True,
     )
 
-    st.dataframe(
-        df_display[
-            [
-                "번호",
-                "맡긴날",
-                "찾는날",
-                "고객이름",
-                "연락처",
-                "옷종류",
-                "기장",
-                "소매",
-                "품",
-                "기타작업",
-                "금액",
-                "결제수단",
-                "선결제",
-                "찾음여부",
-                "출력횟수",
-                "메모",
-            ]
-        ],
-        use_container_width=True,
+    table = df_display[
+        [
+            "번호",
+            "맡긴날",
+            "찾는날",
+            "고객이름",
+            "연락처",
+            "옷종류",
+            "기장",
+            "소매",
+            "품",
+            "기타작업",
+            "금액",
+            "결제수단",
+            "선결제",
+            "찾음여부",
+            "출력횟수",
+            "메모",
+        ]
+    ]
+    return customer_key.nunique(), len(df), int(df["price"].sum()), table
+
+
+def page_list():
+    st.header("📋 매출 내역")
+
+    today = date.today()
+    start_date, end_date = st.date_input(
+        "기간 선택 (맡긴 날 기준)",
+        value=(date(today.year, today.month, 1), today),
+    )
+
+    view = list_view(
+        start_date.strftime("%Y-%m-%d"),
+        end_date.strftime("%Y-%m-%d"),
+        data_generation(),
     )
 
+    if view is None:
+        st.info("데이터 없음")
+        return
+
+    customer_count, garment_count, revenue, table = view
+    st.subheader(f"👥 고객 수: {customer_count} 명")
+    st.subheader(f"👗 옷 개수: {garment_count} 벌")
+    st.subheader(f"💰 매출 합계: {revenue:,} 원")
+
+    st.dataframe(table, use_container_width=True)
+
 
 # ---------------------------
 # 데이터 수정 / 삭제
@@ -861,7 +806,7 @@ def page_edit():
         value=(date(today.year, today.month, 1), today),
     )
 
-    df = load_jobs(
+    df = load_jobs_cached(
         start_date.strftime("%Y-%m-%d"),
         end_date.strftime("%Y-%m-%d"),
     )
@@ -901,15 +846,15 @@ def page_edit():
 
     dropoff_date_input = st.date_input(
         "맡긴 날",
-        value=datetime.strptime(row["dropoff_date"], "%Y-%m-%d").date(),
+        value=date.fromordinal(int(row["dropoff_day"])),
         key="edit_dropoff_date",
     )
 
     pickup_date_input = st.date_input(
         "찾는 날",
         value=(
-            datetime.strptime(row["pickup_date"], "%Y-%m-%d").date()
-            if row["pickup_date"]
+            date.fromordinal(int(row["pickup_day"]))
+            if pd.notna(row["pickup_day"])
             else date.today()
         ),
         key="edit_pickup_date",
@@ -986,41 +931,23 @@ def page_edit():
     # 전표 미리보기
     st.markdown("#### 🧾 작업 전표 미리보기 (내부 보관용)")
 
-    tasks = []
-    if work_hem:
-        tasks.append("기장")
-    if work_sleeve:
-        tasks.append("소매")
-    if work_width:
-        tasks.append("품")
-    if work_other_flag and work_other:
-        tasks.append(work_other)
-
-    task_text = ", ".join(tasks) if tasks else "없음"
-    payment_status = "결제 완료" if is_prepaid == 1 else "미결제"
-    phone_formatted = format_phone(customer_phone)
-
-    receipt_text = f"""────────────────────────
-        에벤에셀옷수선
-────────────────────────
-고객명: {customer_name or ''}
-연락처: {phone_formatted or ''}
-
-맡긴날: {dropoff_date_input.strftime('%Y-%m-%d')}
-찾는날: {pickup_date_input.strftime('%Y-%m-%d')}
-
-종류: {item_type}
-작업: {task_text}
-
-결제 여부: {payment_status}
-결제수단: {payment_method}
-
-금액: {int(price):,}원
-번호(ID): #{job_id}
-────────────────────────
-        내부 보관용
-────────────────────────
-"""
+    receipt_text = build_receipt_text(
+        {
+            "id": job_id,
+            "customer_name": customer_name,
+            "customer_phone": format_phone(customer_phone),
+            "dropoff_date": dropoff_date_input.strftime("%Y-%m-%d"),
+            "pickup_date": pickup_date_input.strftime("%Y-%m-%d"),
+            "item_type": item_type,
+            "work_hem": work_hem,
+            "work_sleeve": work_sleeve,
+            "work_width": work_width,
+            "work_other": work_other if work_other_flag else "",
+            "is_prepaid": is_prepaid,
+            "payment_method": payment_method,
+            "price": price,
+        }
+    )
 
     st.text_area("전표 내용", value=receipt_text, height=260)
     st.caption("※ 인쇄는 브라우저 Ctrl+P를 사용하세요.")
@@ -1056,47 +983,460 @@ def page_edit():
 
 
 # ---------------------------
-# 월별 합계
+# 안 찾아간 옷 / 미수금 보고서
 # ---------------------------
-def page_monthly_summary():
-    st.header("📆 월별 요약")
+def show_aging_summary(df):
+    """경과 구간별 건수 / 금액 합계"""
+    summary = (
+        df.groupby("aging")
+        .agg(건수=("id", "count"), 금액=("price", "sum"))
+        .reindex(AGING_BUCKETS, fill_value=0)
+    )
+    cols = st.columns(len(AGING_BUCKETS))
+    for col, bucket in zip(cols, AGING_BUCKETS):
+        with col:
+            st.metric(
+                bucket,
+                f"{int(summary.loc[bucket, '건수'])} 건",
+                f"{int(summary.loc[bucket, '금액']):,}원",
+                delta_color="off",
+            )
+
+
+def page_overdue():
+    st.header("⏰ 찾는 날 지난 옷")
+
+    if not st.session_state.get("is_admin", False):
+        st.warning("관리자 비밀번호를 입력해야 볼 수 있습니다.")
+        return
 
-    df = load_jobs()
+    df = load_overdue_jobs(date.today().strftime("%Y-%m-%d"))
 
     if df.empty:
-        st.info("데이터 없음")
+        st.info("찾는 날이 지났는데 안 찾아간 옷이 없습니다.")
         return
 
-    df["year_month"] = df["dropoff_date"].str[:7]
+    unpaid = df[df["is_prepaid"] == 0]
+    st.subheader(f"👗 옷 개수: {len(df)} 벌")
+    st.subheader(f"💰 찾아갈 때 받을 금액: {int(unpaid['price'].sum()):,} 원")
 
-    df["customer_key"] = (
-        df["customer_name"].fillna("").astype(str)
-        + "|"
-        + df["customer_phone"].fillna("").astype(str)
-        + "|"
-        + df["dropoff_date"].astype(str)
+    show_aging_summary(df)
+
+    df_display = df.copy()
+    df_display["선결제"] = df_display["is_prepaid"].replace({1: "선결제", 0: "미결제"})
+    df_display.rename(
+        columns={
+            "id": "번호",
+            "pickup_date": "찾는날",
+            "dropoff_date": "맡긴날",
+            "customer_name": "고객이름",
+            "customer_phone": "연락처",
+            "item_type": "옷종류",
+            "price": "금액",
+            "days_overdue": "지난일수",
+            "aging": "구간",
+        },
+        inplace=True,
+    )
+    st.dataframe(
+        df_display[
+            ["번호", "찾는날", "지난일수", "구간", "고객이름", "연락처", "옷종류", "금액", "선결제", "맡긴날"]
+        ],
+        use_container_width=True,
     )
 
-    summary = (
-        df.groupby("year_month")
-        .agg(
-            매출=("price", "sum"),
-            건수=("id", "count"),
-            고객수=("customer_key", "nunique"),
+
+def page_receivables():
+    st.header("💳 미수금")
+
+    if not st.session_state.get("is_admin", False):
+        st.warning("관리자 비밀번호를 입력해야 볼 수 있습니다.")
+        return
+
+    df = load_unpaid_jobs(date.today().strftime("%Y-%m-%d"))
+
+    if df.empty:
+        st.info("받을 돈이 남은 건이 없습니다.")
+        return
+
+    picked = df[df["picked_up"] == 1]
+    st.subheader(f"💰 미수금 합계: {int(df['price'].sum()):,} 원 ({len(df)} 건)")
+    if not picked.empty:
+        st.warning(
+            f"옷은 찾아갔는데 돈을 못 받은 건: {len(picked)} 건 / {int(picked['price'].sum()):,} 원"
         )
-        .reset_index()
+
+    show_aging_summary(df)
+
+    df_display = df.copy()
+    df_display["찾음여부"] = df_display["picked_up"].replace({1: "찾아감", 0: "보관중"})
+    df_display.rename(
+        columns={
+            "id": "번호",
+            "dropoff_date": "맡긴날",
+            "pickup_date": "찾는날",
+            "customer_name": "고객이름",
+            "customer_phone": "연락처",
+            "item_type": "옷종류",
+            "price": "금액",
+            "payment_method": "결제수단",
+            "days_outstanding": "경과일수",
+            "aging": "구간",
+        },
+        inplace=True,
+    )
+    st.dataframe(
+        df_display[
+            ["번호", "맡긴날", "경과일수", "구간", "고객이름", "연락처", "옷종류", "금액", "결제수단", "찾음여부", "찾는날"]
+        ],
+        use_container_width=True,
+    )
+
+
+# ---------------------------
+# 일일 마감
+# ---------------------------
+def closing_display(df):
+    df_display = df.copy()
+    df_display["선결제"] = df_display["is_prepaid"].replace({1: "선결제", 0: "미결제"})
+    df_display.rename(
+        columns={
+            "payment_method": "결제수단",
+            "garments": "옷개수",
+            "customers": "고객수",
+            "revenue": "매출",
+        },
+        inplace=True,
+    )
+    return df_display[["결제수단", "선결제", "옷개수", "고객수", "매출"]]
+
+
+def page_closing():
+    st.header("🧮 일일 마감")
+
+    if not st.session_state.get("is_admin", False):
+        st.warning("관리자 비밀번호를 입력해야 마감을 할 수 있습니다.")
+        return
+
+    stale_days = load_stale_closings()
+    if stale_days:
+        st.warning(
+            "마감 후에 내용이 바뀐 날이 있습니다. 다시 마감해 주세요: "
+            + ", ".join(stale_days)
+        )
+
+    target_date = st.date_input("마감할 날짜 (맡긴 날 기준)", value=date.today())
+    day_str = target_date.strftime("%Y-%m-%d")
+
+    closing = load_closing_day(day_str)
+
+    if closing and not closing["is_stale"]:
+        # 마감된 날은 고정해 둔 합계만 읽음
+        st.success(f"{day_str} 마감 완료 ({closing['closed_at']})")
+        st.subheader(f"💰 매출: {closing['revenue']:,} 원")
+        st.subheader(f"👗 옷 개수: {closing['garments']} 벌 / 👥 고객 수: {closing['customers']} 명")
+        detail = load_closing_detail(day_str)
+        if not detail.empty:
+            st.dataframe(closing_display(detail), use_container_width=True)
+        button_label = "🔁 다시 마감하기"
+    else:
+        live = load_day_totals(day_str)
+        if live.empty:
+            st.info(f"{day_str} 에 맡긴 옷이 없습니다.")
+        else:
+            st.subheader(f"💰 매출: {int(live['revenue'].sum()):,} 원")
+            st.dataframe(closing_display(live), use_container_width=True)
+
+        if closing:
+            st.error(
+                f"{day_str} 은(는) {closing['closed_at']} 에 마감했지만 그 뒤로 수정 / 삭제 / 추가가 있었습니다."
+            )
+            snapshot = load_closing_detail(day_str)
+            keys = ["payment_method", "is_prepaid"]
+            diff = snapshot.merge(live, on=keys, how="outer", suffixes=("_마감", "_현재")).fillna(0)
+            diff = diff[
+                (diff["garments_마감"] != diff["garments_현재"])
+                | (diff["revenue_마감"] != diff["revenue_현재"])
+            ]
+            if not diff.empty:
+                st.markdown("#### 마감 때와 달라진 부분")
+                st.dataframe(diff, use_container_width=True)
+            button_label = "🔁 다시 마감하기"
+        else:
+            button_label = "📌 마감하기"
+
+    if st.button(button_label, use_container_width=True):
+        close_day(day_str)
+        st.rerun()
+
+    st.markdown("---")
+    st.markdown("#### 📚 마감 기록 합계")
+    unit = st.radio("묶음 단위", ["월별", "연도별"], horizontal=True, key="closing_unit")
+    summary = load_closing_summary("month" if unit == "월별" else "year")
+    if summary.empty:
+        st.info("아직 마감한 날이 없습니다.")
+        return
+
+    st.dataframe(
+        summary.rename(
+            columns={
+                "period": "기간",
+                "closed_days": "마감일수",
+                "garments": "옷개수",
+                "revenue": "매출",
+                "card": "카드",
+                "cash": "현금",
+                "transfer": "계좌이체",
+                "unpaid": "미결제",
+            }
+        ),
+        use_container_width=True,
+    )
+
+
+# ---------------------------
+# 월별 합계
+# ---------------------------
+def page_monthly_summary():
+    st.header("📆 월별 요약")
+
+    unit = st.radio("묶음 단위", ["월별", "주별(ISO)"], horizontal=True)
+    group_col = "year_month" if unit == "월별" else "iso_week"
+
+    # 지난 달은 Parquet 스냅샷에서, 이번 달 / 아직 안 떠 둔 달만 DB 에서 집계
+    df = shop_analytics.load_period_summary(group_col)
+
+    if df.empty:
+        st.info("데이터 없음")
+        return
+
+    summary = df.rename(
+        columns={
+            "period": group_col,
+            "revenue": "매출",
+            "garments": "건수",
+            "customers": "고객수",
+        }
     )
 
     st.dataframe(summary, use_container_width=True)
 
     latest = summary.iloc[-1]
-    st.subheader(f"📌 최근 월 ({latest['year_month']})")
+    title = "최근 월" if unit == "월별" else "최근 주"
+    st.subheader(f"📌 {title} ({latest[group_col]})")
     st.write(
         f"- 매출: {int(latest['매출']):,} 원\n"
         f"- 건수: {int(latest['건수'])} 벌\n"
         f"- 고객수: {int(latest['고객수'])} 명"
     )
 
+    if st.session_state.get("is_admin", False):
+        with st.expander("🗂️ 지난 달 스냅샷 (분석용 Parquet)"):
+            status = shop_analytics.load_snapshot_status()
+            pending = len(status[status["is_stale"] == 1]) if not status.empty else 0
+            st.caption(
+                f"{len(status)}개월 저장됨 / 다시 써야 하는 달 {pending}개 - "
+                "DB 정기 점검 때 자동으로 갱신됩니다."
+            )
+            if st.button("지금 갱신하기", key="refresh_snapshot"):
+                written = shop_analytics.refresh_snapshot()
+                if written:
+                    st.success(", ".join(f"{m} ({n}건)" for m, n in written.items()) + " 저장")
+                else:
+                    st.info("새로 저장할 달이 없습니다.")
+                status = shop_analytics.load_snapshot_status()
+            if not status.empty:
+                st.dataframe(
+                    status.rename(
+                        columns={
+                            "year_month": "연월",
+                            "rows": "건수",
+                            "written_at": "저장 시각",
+                            "is_stale": "다시 써야 함",
+                        }
+                    ),
+                    use_container_width=True,
+                )
+
+
+# ---------------------------
+# 매출 추세 (일별 집계 daily_rollup 으로)
+# ---------------------------
+TREND_PERIODS = {"최근 90일": 90, "최근 180일": 180, "최근 1년": 365}
+
+
+def _delta(this, last):
+    if not last:
+        return None
+    return f"{(this - last) / last:+.0%}"
+
+
+def page_trends():
+    st.header("📈 매출 추세")
+    today = date.today()
+
+    # 이번 달 1일 ~ 오늘 vs 작년 같은 기간
+    mtd = load_month_to_date(today.strftime("%Y-%m-%d"))
+    this, last = mtd["this"], mtd["last"]
+    st.subheader(f"🗓️ 이번 달 ({mtd['this_range'][0]} ~ {mtd['this_range'][1]})")
+    st.caption(f"작년 같은 기간: {mtd['last_range'][0]} ~ {mtd['last_range'][1]}")
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        st.metric(
+            "매출",
+            f"{this['revenue']:,} 원",
+            _delta(this["revenue"], last["revenue"]),
+            help=f"작년 {last['revenue']:,} 원",
+        )
+    with c2:
+        st.metric(
+            "건수",
+            f"{this['garments']} 벌",
+            _delta(this["garments"], last["garments"]),
+            help=f"작년 {last['garments']} 벌",
+        )
+    with c3:
+        st.metric(
+            "고객수",
+            f"{this['customers']} 명",
+            _delta(this["customers"], last["customers"]),
+            help=f"작년 {last['customers']} 명",
+        )
+
+    days = TREND_PERIODS[st.radio("기간", list(TREND_PERIODS), horizontal=True)]
+    start_str = (today - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    end_str = today.strftime("%Y-%m-%d")
+
+    # 기간 날짜 수만큼만 읽음 (몇 년치 내역이 쌓여도 같음)
+    df = load_daily_trend(start_str, end_str)
+    if df["revenue"].sum() == 0:
+        st.info("이 기간 매출이 없습니다.")
+        return
+
+    chart = df.set_index("day")
+    st.subheader("💰 일별 매출과 이동평균")
+    st.line_chart(
+        chart[["revenue", "ma7", "ma30"]].rename(
+            columns={"revenue": "일 매출", "ma7": "7일 평균", "ma30": "30일 평균"}
+        )
+    )
+
+    st.subheader("📊 기간 누적 매출")
+    st.area_chart(chart[["cumulative"]].rename(columns={"cumulative": "누적 매출"}))
+    st.write(
+        f"- 기간 매출: {int(df['revenue'].sum()):,} 원\n"
+        f"- 건수: {int(df['garments'].sum())} 벌\n"
+        f"- 하루 평균: {int(df['revenue'].mean()):,} 원"
+    )
+
+    st.subheader("💳 결제수단별")
+    pay = load_payment_trend(start_str, end_str)
+    if pay.empty:
+        return
+    by_week = (
+        pay.assign(week=pd.to_datetime(pay["day"]).dt.to_period("W").dt.start_time)
+        .pivot_table(
+            index="week",
+            columns="payment_method",
+            values="revenue",
+            aggfunc="sum",
+            fill_value=0,
+        )
+    )
+    st.bar_chart(by_week)
+    st.dataframe(
+        pay.groupby("payment_method", as_index=False)[["revenue", "garments"]]
+        .sum()
+        .rename(columns={"payment_method": "결제수단", "revenue": "매출", "garments": "건수"}),
+        use_container_width=True,
+    )
+
+
+# ---------------------------
+# DB 관리 (정기 점검 보고)
+# ---------------------------
+def page_maintenance():
+    st.header("🛠️ DB 관리")
+
+    if not st.session_state.get("is_admin", False):
+        st.warning("관리자 비밀번호를 입력해야 볼 수 있습니다.")
+        return
+
+    scheduler = maintenance_scheduler()
+    st.caption(
+        f"가게 화면 조작이 {scheduler.idle_after // 60}분 이상 없을 때 "
+        f"{scheduler.interval_seconds // 3600}시간마다 한 번씩 자동으로 점검합니다. "
+        f"(작업 하나당 최대 {scheduler.budget_seconds:g}초)"
+    )
+
+    stats = shop_maintenance.db_file_stats()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("파일 크기", f"{stats['file_bytes'] / 1024 / 1024:.2f} MB")
+    with col2:
+        st.metric("전체 페이지", f"{stats['page_count'] or 0:,}")
+    with col3:
+        st.metric("빈 페이지", f"{stats['freelist_pages'] or 0:,}")
+    st.caption(f"페이지 크기 {stats['page_size']} 바이트 / auto_vacuum: {stats['auto_vacuum']}")
+
+    if st.button("🧹 지금 점검하기", use_container_width=True):
+        with st.spinner("점검 중..."):
+            shop_maintenance.run_maintenance()
+
+    report = shop_maintenance.last_report
+    if report:
+        st.markdown(f"#### 마지막 점검 ({report['run_at']})")
+        before, after = report["before"], report["after"]
+        st.write(
+            f"- 파일 크기: {before['file_bytes']:,} → {after['file_bytes']:,} 바이트\n"
+            f"- 빈 페이지: {before['freelist_pages']} → {after['freelist_pages']}"
+        )
+        st.dataframe(pd.DataFrame(report["tasks"]), use_container_width=True)
+
+    show_warm_start_status()
+
+    log = shop_maintenance.load_maintenance_log()
+    if not log.empty:
+        st.markdown("#### 점검 기록")
+        st.dataframe(
+            log.rename(
+                columns={
+                    "run_at": "실행시각",
+                    "task": "작업",
+                    "status": "결과",
+                    "seconds": "걸린시간(초)",
+                    "detail": "내용",
+                }
+            ),
+            use_container_width=True,
+        )
+
+
+def show_warm_start_status():
+    st.markdown("#### 화면 속도 (이번 서버 실행)")
+    latency = warm_start().summary()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(
+            "첫 화면",
+            f"{latency['first_ms']:.0f} ms" if latency["first_ms"] is not None else "-",
+            help=latency["first_page"],
+        )
+    with col2:
+        st.metric("평소 (중앙값)", f"{latency['p50_ms']:.0f} ms" if latency["p50_ms"] is not None else "-")
+    with col3:
+        st.metric("평소 (90%)", f"{latency['p90_ms']:.0f} ms" if latency["p90_ms"] is not None else "-")
+
+    report = shop_warmup.last_report
+    if report is None:
+        st.caption("시작 준비(캐시 데우기)가 아직 진행 중입니다.")
+        return
+    steps = " / ".join(f"{name} {ms:.0f}ms" for name, ms in report["steps"].items())
+    st.caption(
+        f"시작 준비 {report['started_at']}: {steps} (합계 {report['total_ms']:.0f}ms)"
+        + (f" - 오류: {report['error']}" if "error" in report else "")
+    )
+
 
 # ---------------------------
 # 실행
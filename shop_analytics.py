@@ -0,0 +1,286 @@
+"""
+에벤에셀옷수선 매출장 - 지난 달 분석용 Parquet 스냅샷.
+
+지난 달들(이번 달 이전)의 jobs 를 달마다 Parquet 파일 하나로 떠 두고
+(폴더 이름 year_month=YYYY-MM, zstd 압축, 날짜 / 숫자 / 범주 타입 그대로),
+새로 지난 달만 덧붙인다. 이미 떠 둔 달의 옷이 고쳐지거나 지워지면 트리거가
+snapshot_months 표에 표시해 두고, 다음 갱신 때 그 달만 다시 쓴다.
+
+여러 해 매출이나 옷 종류별 계절 흐름 같은 긴 기간 보고서는 필요한 컬럼 / 달만
+Parquet 에서 읽고, 아직 스냅샷이 없는 달(이번 달 포함)만 DB 에서 읽는다.
+
+pyarrow 가 필요하다 (requirements.txt 에 있음).
+"""
+import os
+import shutil
+from datetime import date, datetime
+
+import shop_db
+
+# 컬럼별 Parquet 타입 (jobs 의 TEXT 날짜 / 0·1 정수를 알맞은 타입으로)
+_DATE_COLUMNS = {"dropoff_date", "pickup_date"}
+_BOOL_COLUMNS = {"work_hem", "work_sleeve", "work_width", "is_prepaid", "picked_up"}
+_CATEGORY_COLUMNS = {"item_type", "payment_method"}
+
+
+def snapshot_dir():
+    """스냅샷 폴더 - DB 파일 옆 (mom_shop.db → mom_shop_analytics/)"""
+    return os.environ.get(
+        "MOM_SHOP_SNAPSHOT", os.path.splitext(shop_db.DB_PATH)[0] + "_analytics"
+    )
+
+
+def _schema():
+    import pyarrow as pa
+
+    types = {
+        "id": pa.int64(),
+        "price": pa.int32(),
+        "printed_count": pa.int16(),
+        "created_at": pa.timestamp("s"),
+    }
+    fields = []
+    for c in shop_db.JOB_COLUMNS:
+        if c in _DATE_COLUMNS:
+            t = pa.date32()
+        elif c in _BOOL_COLUMNS:
+            t = pa.bool_()
+        elif c in _CATEGORY_COLUMNS:
+            t = pa.dictionary(pa.int32(), pa.string())
+        else:
+            t = types.get(c, pa.string())
+        fields.append(pa.field(c, t))
+    return pa.schema(fields)
+
+
+def _partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return ds.partitioning(pa.schema([("year_month", pa.string())]), flavor="hive")
+
+
+def _to_date(s):
+    return date.fromisoformat(s) if s else None
+
+
+def _to_datetime(s):
+    return datetime.fromisoformat(s) if s else None
+
+
+def _month_table(rows):
+    """jobs 행(tuple) 목록 → pyarrow Table"""
+    import pyarrow as pa
+
+    schema = _schema()
+    columns = list(zip(*rows)) if rows else [()] * len(schema)
+    arrays = []
+    for field, values in zip(schema, columns):
+        if field.name in _DATE_COLUMNS:
+            values = [_to_date(v) for v in values]
+        elif field.name == "created_at":
+            values = [_to_datetime(v) for v in values]
+        elif field.name in _BOOL_COLUMNS:
+            values = [bool(v) for v in values]
+        if field.name in _CATEGORY_COLUMNS:
+            arrays.append(pa.array(values, pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+# ---------------------------
+# 스냅샷 만들기 / 갱신
+# ---------------------------
+def pending_months(conn, today=None):
+    """스냅샷을 (다시) 써야 하는 지난 달 목록: 아직 없는 달 + 떠 둔 뒤 바뀐 달"""
+    this_month = (today or date.today()).strftime("%Y-%m")
+    return [
+        r[0]
+        for r in conn.execute(
+            """
+            SELECT year_month FROM (
+                SELECT DISTINCT year_month FROM jobs WHERE year_month < ?
+                EXCEPT
+                SELECT year_month FROM snapshot_months WHERE is_stale = 0
+            )
+            UNION
+            SELECT year_month FROM snapshot_months WHERE is_stale = 1
+            ORDER BY 1
+            """,
+            (this_month,),
+        )
+    ]
+
+
+def _write_month(conn, year_month):
+    """
+    한 달치를 Parquet 으로 씀 (옷이 하나도 안 남았으면 폴더를 지움). 쓴 건수를 돌려줌.
+    쓰기 잠금(BEGIN IMMEDIATE) 안에서 부를 것.
+    """
+    import pyarrow.parquet as pq
+
+    columns = ", ".join(shop_db.JOB_COLUMNS)
+    rows = conn.execute(
+        f"SELECT {columns} FROM jobs WHERE year_month = ? ORDER BY id", (year_month,)
+    ).fetchall()
+
+    part_dir = os.path.join(snapshot_dir(), f"year_month={year_month}")
+    if not rows:
+        shutil.rmtree(part_dir, ignore_errors=True)
+        conn.execute("DELETE FROM snapshot_months WHERE year_month = ?", (year_month,))
+        return 0
+
+    os.makedirs(part_dir, exist_ok=True)
+    path = os.path.join(part_dir, "part-0.parquet")
+    tmp = path + ".tmp"
+    pq.write_table(_month_table(rows), tmp, compression="zstd")
+    os.replace(tmp, path)
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO snapshot_months (year_month, rows, written_at, is_stale)
+        VALUES (?, ?, ?, 0)
+        """,
+        (year_month, len(rows), datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+    )
+    return len(rows)
+
+
+def refresh_snapshot(conn=None, today=None):
+    """
+    새로 지난 달과 바뀐 달만 Parquet 으로 씀. {연월: 건수} 를 돌려준다.
+    conn 을 주면 그 연결을 씀 (정기 점검에서 시간 제한을 걸 때).
+    """
+    own = conn is None
+    if own:
+        conn = shop_db._connect()
+    try:
+        written = {}
+        for year_month in pending_months(conn, today):
+            # 달마다 따로 커밋 - 중간에 멈춰도 다 쓴 달은 남음.
+            # 읽기부터 is_stale = 0 기록까지 쓰기 잠금을 잡아서, 그 사이 다른 연결의 수정이
+            # 트리거로 남긴 is_stale = 1 을 덮어쓰지 않게 함
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                written[year_month] = _write_month(conn, year_month)
+                conn.execute("COMMIT")
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+        return written
+    finally:
+        if own:
+            conn.close()
+
+
+def snapshot_months():
+    """지금 스냅샷에서 읽어도 되는 달 목록 (표에 최신으로 기록돼 있고 파일도 있는 달)"""
+    conn = shop_db._connect()
+    months = [
+        r[0]
+        for r in conn.execute(
+            "SELECT year_month FROM snapshot_months WHERE is_stale = 0 ORDER BY year_month"
+        )
+    ]
+    conn.close()
+    base = snapshot_dir()
+    return [
+        m for m in months
+        if os.path.exists(os.path.join(base, f"year_month={m}", "part-0.parquet"))
+    ]
+
+
+def load_snapshot_status():
+    conn = shop_db._connect()
+    df = shop_db._read_df(
+        "SELECT year_month, rows, written_at, is_stale FROM snapshot_months ORDER BY year_month",
+        conn,
+    )
+    conn.close()
+    return df
+
+
+# ---------------------------
+# 스냅샷 읽기
+# ---------------------------
+def read_snapshot(columns=None, months=None):
+    """
+    스냅샷을 pandas DataFrame 으로 읽음.
+    columns: 읽을 컬럼 (year_month 포함 가능), months: 읽을 달 목록 - 나머지 달 파일은 열지 않음
+    """
+    import pyarrow.dataset as ds
+
+    if months is None:
+        months = snapshot_months()
+    if not months:
+        import pandas as pd
+
+        return pd.DataFrame(columns=columns or list(shop_db.JOB_COLUMNS) + ["year_month"])
+
+    dataset = ds.dataset(snapshot_dir(), format="parquet", partitioning=_partitioning())
+    table = dataset.to_table(columns=columns, filter=ds.field("year_month").isin(months))
+    return table.to_pandas()
+
+
+def _summarize(df, group_col):
+    """옷 한 벌씩인 DataFrame → 기간별 매출 / 건수 / 고객수"""
+    import pandas as pd
+
+    if df.empty:
+        return pd.DataFrame(columns=["period", "revenue", "garments", "customers"])
+
+    if group_col == "year_month":
+        period = df["year_month"].astype(str)
+    else:
+        # 날짜 종류는 많아야 몇 천 개라서 날짜마다 한 번만 계산해서 붙임
+        weeks = {
+            d: f"{d.isocalendar()[0]}-W{d.isocalendar()[1]:02d}"
+            for d in df["dropoff_date"].unique()
+        }
+        period = df["dropoff_date"].map(weeks)
+
+    # 고객 = 같은 날 같은 이름 / 전화번호 (load_period_summary 와 같은 기준)
+    keys = pd.DataFrame(
+        {
+            "period": period,
+            "name": df["customer_name"].fillna(""),
+            "phone": df["customer_phone"].fillna(""),
+            "day": df["dropoff_date"],
+        }
+    )
+    summary = (
+        pd.DataFrame({"period": period, "price": df["price"].astype("int64")})
+        .groupby("period")["price"]
+        .agg(revenue="sum", garments="count")
+    )
+    summary["customers"] = keys.drop_duplicates().groupby("period").size()
+    return summary.reset_index()
+
+
+def load_period_summary(group_col="year_month"):
+    """
+    shop_db.load_period_summary 와 같은 결과.
+    스냅샷이 있는 달은 Parquet 에서 필요한 컬럼만 읽고, 나머지 달만 DB 에서 집계한다.
+    고객 기준에 날짜가 들어가서 한 고객이 두 달에 걸치지 않으므로 양쪽 합이 그대로 맞다.
+    """
+    import pandas as pd
+
+    months = snapshot_months()
+    live = shop_db.load_period_summary(group_col, exclude_months=months)
+    if not months:
+        return live
+
+    snap = _summarize(
+        read_snapshot(
+            ["year_month", "dropoff_date", "customer_name", "customer_phone", "price"], months
+        ),
+        group_col,
+    )
+    combined = (
+        pd.concat([snap, live], ignore_index=True)
+        .groupby("period", as_index=False)[["revenue", "garments", "customers"]]
+        .sum()
+        .sort_values("period", ignore_index=True)
+    )
+    return combined.astype({"revenue": "int64", "garments": "int64", "customers": "int64"})
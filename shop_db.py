@@ -0,0 +1,1930 @@
+"""
+에벤에셀옷수선 매출장 - 데이터 저장 계층.
+
+Streamlit 없이도 import 할 수 있도록 화면 코드와 분리한 모듈.
+(일괄 처리 스크립트 등에서 load_jobs / insert_job 만 쓰고 싶을 때)
+pandas 는 DataFrame 을 돌려주는 함수에서만 필요할 때 import 한다.
+"""
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict, defaultdict
+from datetime import datetime, date
+
+# 환경변수 MOM_SHOP_DB 로 다른 DB 파일을 쓸 수 있음 (부하 테스트 / 일괄 처리용)
+DB_PATH = os.environ.get("MOM_SHOP_DB", "mom_shop.db")
+
+
+# 읽기 설정: DB 파일을 메모리에 매핑(mmap)해서 OS 가 캐시해 둔 페이지를 복사 없이 읽고,
+# 연결마다 쓰는 페이지 캐시도 기본(2MB)보다 조금 크게 둠
+MMAP_SIZE = int(os.environ.get("MOM_SHOP_MMAP_MB", "256")) * 1024 * 1024
+CACHE_SIZE_KB = 8 * 1024
+
+
+def _connect():
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+    return conn
+
+
+def _read_df(query, conn, params=()):
+    import pandas as pd
+
+    return pd.read_sql_query(query, conn, params=params)
+
+
+# ---------------------------
+# 연락처 포맷팅 함수
+# ---------------------------
+def format_phone(raw):
+    """
+    문자열에서 숫자만 뽑아서 휴대폰/전화번호 형태로 포맷팅.
+    기본적으로 010 번호를 우선 가정.
+    """
+    if raw is None:
+        return ""
+
+    digits = "".join(ch for ch in str(raw) if ch.isdigit())
+
+    if not digits:
+        return ""
+
+    # 8자리만 입력한 경우 → 010-xxxx-xxxx 로 간주
+    if len(digits) == 8:
+        return f"010-{digits[:4]}-{digits[4:]}"
+
+    # 11자리, 010으로 시작
+    if len(digits) == 11 and digits.startswith("010"):
+        return f"{digits[:3]}-{digits[3:7]}-{digits[7:]}"
+
+    # 10자리, 0으로 시작 (지역번호 포함)
+    if len(digits) == 10 and digits.startswith("0"):
+        if digits.startswith("02"):
+            return f"{digits[:2]}-{digits[2:6]}-{digits[6:]}"
+        else:
+            return f"{digits[:3]}-{digits[3:6]}-{digits[6:]}"
+
+    # 기타 11자리
+    if len(digits) == 11:
+        return f"{digits[:3]}-{digits[3:7]}-{digits[7:]}"
+
+    # 그 외는 그냥 숫자 그대로
+    return digits
+
+
+# ---------------------------
+# DB 초기화
+# ---------------------------
+# jobs 뷰: 이름표를 붙여서 예전 jobs 표와 같은 컬럼 / 순서로 보여 줌 (읽기는 모두 이 뷰로)
+# CROSS JOIN 은 job_rows 를 항상 바깥에 두게 해서 이름표는 id 로 한 번씩만 찾는다.
+_JOBS_VIEW_SQL = """
+    CREATE VIEW IF NOT EXISTS jobs AS
+    SELECT
+        j.id,
+        j.dropoff_date,
+        j.customer_name,
+        j.customer_phone,
+        t.name AS item_type,
+        j.work_flags & 1 AS work_hem,
+        (j.work_flags >> 1) & 1 AS work_sleeve,
+        (j.work_flags >> 2) & 1 AS work_width,
+        j.work_other,
+        j.price,
+        p.name AS payment_method,
+        j.is_prepaid,
+        j.pickup_date,
+        j.picked_up,
+        j.memo,
+        j.printed_count,
+        j.created_at,
+        j.year_month,
+        j.iso_week,
+        j.dropoff_day,
+        j.pickup_day
+    FROM job_rows j
+    CROSS JOIN item_types t ON t.id = j.item_type_id
+    CROSS JOIN payment_methods p ON p.id = j.payment_method_id
+"""
+
+
+# 예전처럼 jobs 에 직접 INSERT / UPDATE / DELETE 하는 스크립트도 그대로 동작하도록 뷰에 거는 트리거
+# (화면 / 이 모듈의 쓰기 함수는 job_rows 에 바로 씀)
+_JOBS_VIEW_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_jobs_view_insert
+    INSTEAD OF INSERT ON jobs
+    BEGIN
+        INSERT OR IGNORE INTO item_types (name) VALUES (NEW.item_type);
+        INSERT OR IGNORE INTO payment_methods (name) VALUES (NEW.payment_method);
+        INSERT INTO job_rows (
+            id, dropoff_date, customer_name, customer_phone,
+            item_type_id, work_flags, work_other,
+            price, payment_method_id, is_prepaid, pickup_date,
+            picked_up, memo, printed_count, created_at
+        ) VALUES (
+            NEW.id, NEW.dropoff_date, NEW.customer_name, NEW.customer_phone,
+            (SELECT id FROM item_types WHERE name = NEW.item_type),
+            (CASE WHEN NEW.work_hem THEN 1 ELSE 0 END)
+                | (CASE WHEN NEW.work_sleeve THEN 2 ELSE 0 END)
+                | (CASE WHEN NEW.work_width THEN 4 ELSE 0 END),
+            NEW.work_other,
+            NEW.price,
+            (SELECT id FROM payment_methods WHERE name = NEW.payment_method),
+            COALESCE(NEW.is_prepaid, 1), NEW.pickup_date,
+            COALESCE(NEW.picked_up, 0), NEW.memo, COALESCE(NEW.printed_count, 0),
+            COALESCE(NEW.created_at, datetime('now', 'localtime'))
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_jobs_view_update
+    INSTEAD OF UPDATE ON jobs
+    BEGIN
+        INSERT OR IGNORE INTO item_types (name) VALUES (NEW.item_type);
+        INSERT OR IGNORE INTO payment_methods (name) VALUES (NEW.payment_method);
+        UPDATE job_rows SET
+            dropoff_date = NEW.dropoff_date,
+            customer_name = NEW.customer_name,
+            customer_phone = NEW.customer_phone,
+            item_type_id = (SELECT id FROM item_types WHERE name = NEW.item_type),
+            work_flags = (CASE WHEN NEW.work_hem THEN 1 ELSE 0 END)
+                | (CASE WHEN NEW.work_sleeve THEN 2 ELSE 0 END)
+                | (CASE WHEN NEW.work_width THEN 4 ELSE 0 END),
+            work_other = NEW.work_other,
+            price = NEW.price,
+            payment_method_id = (SELECT id FROM payment_methods WHERE name = NEW.payment_method),
+            is_prepaid = NEW.is_prepaid,
+            pickup_date = NEW.pickup_date,
+            picked_up = NEW.picked_up,
+            memo = NEW.memo,
+            printed_count = NEW.printed_count,
+            created_at = NEW.created_at
+        WHERE id = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_jobs_view_delete
+    INSTEAD OF DELETE ON jobs
+    BEGIN
+        DELETE FROM job_rows WHERE id = OLD.id;
+    END
+    """,
+]
+
+
+def _migrate_legacy_jobs(cur):
+    """예전 jobs 표 → 이름표 + job_rows (번호와 AUTOINCREMENT 순번은 그대로)"""
+    # 아주 예전 DB 에 printed_count 컬럼이 없으면 먼저 추가
+    cur.execute("PRAGMA table_info(jobs)")
+    cols = [row[1] for row in cur.fetchall()]
+    if "printed_count" not in cols:
+        cur.execute(
+            "ALTER TABLE jobs ADD COLUMN printed_count INTEGER NOT NULL DEFAULT 0"
+        )
+
+    cur.execute("INSERT OR IGNORE INTO item_types (name) SELECT DISTINCT item_type FROM jobs")
+    cur.execute(
+        "INSERT OR IGNORE INTO payment_methods (name) SELECT DISTINCT payment_method FROM jobs"
+    )
+    cur.execute(
+        """
+        INSERT INTO job_rows (
+            id, dropoff_date, customer_name, customer_phone,
+            item_type_id, work_flags, work_other,
+            price, payment_method_id, is_prepaid, pickup_date,
+            picked_up, memo, printed_count, created_at
+        )
+        SELECT
+            j.id, j.dropoff_date, j.customer_name, j.customer_phone,
+            t.id,
+            (CASE WHEN j.work_hem THEN 1 ELSE 0 END)
+                | (CASE WHEN j.work_sleeve THEN 2 ELSE 0 END)
+                | (CASE WHEN j.work_width THEN 4 ELSE 0 END),
+            j.work_other,
+            j.price, p.id, j.is_prepaid, j.pickup_date,
+            j.picked_up, j.memo, j.printed_count, j.created_at
+        FROM jobs j
+        JOIN item_types t ON t.name = j.item_type
+        JOIN payment_methods p ON p.name = j.payment_method
+        """
+    )
+    # 지운 번호를 다시 쓰지 않도록 순번도 옮김 (매장 간 동기화가 번호로 건을 구분함)
+    cur.execute("DELETE FROM sqlite_sequence WHERE name = 'job_rows'")
+    cur.execute(
+        """
+        INSERT INTO sqlite_sequence (name, seq)
+        SELECT 'job_rows', seq FROM sqlite_sequence WHERE name = 'jobs'
+        """
+    )
+    # 표와 함께 예전 인덱스 / 트리거도 지워지고, init_db 가 job_rows 에 다시 만든다
+    cur.execute("DROP TABLE jobs")
+
+
+def _add_names(cur, item_types=(), payment_methods=()):
+    """처음 보는 옷 종류 / 결제수단이면 이름표에 추가"""
+    cur.executemany(
+        "INSERT OR IGNORE INTO item_types (name) VALUES (?)",
+        [(name,) for name in set(item_types) if name is not None],
+    )
+    cur.executemany(
+        "INSERT OR IGNORE INTO payment_methods (name) VALUES (?)",
+        [(name,) for name in set(payment_methods) if name is not None],
+    )
+
+
+def init_db():
+    conn = _connect()
+    cur = conn.cursor()
+
+    # 옷 종류 / 결제수단 이름표 + 실제 저장 표(job_rows) + 예전 컬럼 그대로 보여 주는 jobs 뷰
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS item_types (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS payment_methods (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+        """
+    )
+
+    # 날짜로 묶고 찾기 위한 생성 컬럼 (TEXT 날짜 → 연월 / ISO 주 / 정수 날짜번호)
+    # 날짜번호는 파이썬 date.toordinal() 값과 같다.
+    # work_flags: 기장 / 소매 / 품을 비트 하나씩 (1=기장, 2=소매, 4=품, work_flags() 와 같음)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS job_rows (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            dropoff_date TEXT NOT NULL,
+            customer_name TEXT,
+            customer_phone TEXT,
+            item_type_id INTEGER NOT NULL REFERENCES item_types(id),
+            work_flags INTEGER NOT NULL DEFAULT 0,
+            work_other TEXT,
+            price INTEGER NOT NULL,
+            payment_method_id INTEGER NOT NULL REFERENCES payment_methods(id),
+            is_prepaid INTEGER NOT NULL DEFAULT 1,
+            pickup_date TEXT,
+            picked_up INTEGER NOT NULL DEFAULT 0,
+            memo TEXT,
+            printed_count INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL,
+            year_month TEXT GENERATED ALWAYS AS (substr(dropoff_date, 1, 7)) VIRTUAL,
+            iso_week TEXT GENERATED ALWAYS AS (
+                strftime('%Y', dropoff_date, '-3 days', 'weekday 4') || '-W' ||
+                printf('%02d', (CAST(strftime('%j', dropoff_date, '-3 days', 'weekday 4') AS INTEGER) - 1) / 7 + 1)
+            ) VIRTUAL,
+            dropoff_day INTEGER GENERATED ALWAYS AS (CAST(julianday(dropoff_date) - 1721424.5 AS INTEGER)) VIRTUAL,
+            pickup_day INTEGER GENERATED ALWAYS AS (CAST(julianday(pickup_date) - 1721424.5 AS INTEGER)) VIRTUAL
+        )
+        """
+    )
+
+    # 예전 DB 는 jobs 가 글자를 그대로 담은 표 → job_rows 로 옮기고 표는 지움
+    legacy = cur.execute("SELECT type FROM sqlite_master WHERE name = 'jobs'").fetchone()
+    if legacy and legacy[0] == "table":
+        _migrate_legacy_jobs(cur)
+
+    cur.execute(_JOBS_VIEW_SQL)
+    for sql in _JOBS_VIEW_TRIGGERS:
+        cur.execute(sql)
+
+    # 아직 안 찾아간 옷의 찾는 날 인덱스 (대시보드 / 찾는 날 달력용)
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_jobs_open_pickup
+        ON job_rows(pickup_date) WHERE picked_up = 0
+        """
+    )
+
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_year_month ON job_rows(year_month)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_iso_week ON job_rows(iso_week)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_dropoff_day ON job_rows(dropoff_day)")
+
+    # 미결제(외상) 건만 담는 부분 인덱스 (미수금 보고서용)
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_jobs_unpaid
+        ON job_rows(dropoff_date) WHERE is_prepaid = 0
+        """
+    )
+
+    # 일일 마감: 결제수단 / 선결제 여부별 합계와 그날 전체 합계를 고정해 둠
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS daily_closing (
+            close_date TEXT NOT NULL,
+            payment_method TEXT NOT NULL,
+            is_prepaid INTEGER NOT NULL,
+            garments INTEGER NOT NULL,
+            customers INTEGER NOT NULL,
+            revenue INTEGER NOT NULL,
+            PRIMARY KEY (close_date, payment_method, is_prepaid)
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS closing_days (
+            close_date TEXT PRIMARY KEY,
+            garments INTEGER NOT NULL,
+            customers INTEGER NOT NULL,
+            revenue INTEGER NOT NULL,
+            closed_at TEXT NOT NULL,
+            is_stale INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+
+    # 가격 추천용 통계: 옷 종류 × 작업 조합(work_flags)별 가격 분포와 백분위
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS price_hist (
+            item_type TEXT NOT NULL,
+            work_flags INTEGER NOT NULL,
+            price INTEGER NOT NULL,
+            cnt INTEGER NOT NULL,
+            PRIMARY KEY (item_type, work_flags, price)
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS price_stats (
+            item_type TEXT NOT NULL,
+            work_flags INTEGER NOT NULL,
+            n INTEGER NOT NULL,
+            p25 INTEGER NOT NULL,
+            p50 INTEGER NOT NULL,
+            p75 INTEGER NOT NULL,
+            PRIMARY KEY (item_type, work_flags)
+        )
+        """
+    )
+    # 처음 만들었으면 기존 내역으로 한 번 채움
+    if (
+        cur.execute("SELECT 1 FROM price_hist LIMIT 1").fetchone() is None
+        and cur.execute("SELECT 1 FROM jobs LIMIT 1").fetchone() is not None
+    ):
+        _rebuild_price_stats(cur)
+
+    # 변경 기록 (매장 간 동기화용, shop_sync) - job_rows 에 쓰기가 있을 때마다 트리거가 남김
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER NOT NULL,
+            op TEXT NOT NULL
+        )
+        """
+    )
+    for op, event, ref in (("I", "INSERT", "NEW"), ("U", "UPDATE", "NEW"), ("D", "DELETE", "OLD")):
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_jobs_{event.lower()}_log
+            AFTER {event} ON job_rows
+            BEGIN
+                INSERT INTO change_log (job_id, op) VALUES ({ref}.id, '{op}');
+            END
+            """
+        )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS store_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+        """
+    )
+
+    # 일별 매출 집계 (추세 화면용) - 옷이 저장 / 수정 / 삭제될 때 트리거가 그날만 다시 계산
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS daily_rollup (
+            day TEXT PRIMARY KEY,
+            revenue INTEGER NOT NULL,
+            garments INTEGER NOT NULL,
+            customers INTEGER NOT NULL
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS daily_rollup_payment (
+            day TEXT NOT NULL,
+            payment_method TEXT NOT NULL,
+            revenue INTEGER NOT NULL,
+            garments INTEGER NOT NULL,
+            customers INTEGER NOT NULL,
+            PRIMARY KEY (day, payment_method)
+        )
+        """
+    )
+    for event, days in (
+        ("INSERT", ["NEW.dropoff_date"]),
+        ("UPDATE", ["OLD.dropoff_date", "NEW.dropoff_date"]),
+        ("DELETE", ["OLD.dropoff_date"]),
+    ):
+        # 찾아감 / 출력 표시처럼 매출과 상관없는 수정에는 안 돌도록 컬럼을 지정
+        columns = (
+            " OF dropoff_date, customer_name, customer_phone, price, payment_method_id"
+            if event == "UPDATE"
+            else ""
+        )
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_jobs_{event.lower()}_rollup
+            AFTER {event}{columns} ON job_rows
+            BEGIN
+                {"".join(_rollup_day_sql(d) for d in days)}
+            END
+            """
+        )
+    # 처음 만들었으면 기존 내역으로 한 번 채움
+    if (
+        cur.execute("SELECT 1 FROM daily_rollup LIMIT 1").fetchone() is None
+        and cur.execute("SELECT 1 FROM job_rows LIMIT 1").fetchone() is not None
+    ):
+        _rebuild_daily_rollup(cur)
+
+    # 분석용 Parquet 스냅샷에 떠 둔 달 (shop_analytics)
+    # 떠 둔 달의 옷이 바뀌면 트리거가 is_stale 로 표시 → 다음 갱신 때 그 달만 다시 씀
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS snapshot_months (
+            year_month TEXT PRIMARY KEY,
+            rows INTEGER NOT NULL,
+            written_at TEXT NOT NULL,
+            is_stale INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    for event, months in (
+        ("INSERT", "substr(NEW.dropoff_date, 1, 7)"),
+        ("UPDATE", "substr(OLD.dropoff_date, 1, 7), substr(NEW.dropoff_date, 1, 7)"),
+        ("DELETE", "substr(OLD.dropoff_date, 1, 7)"),
+    ):
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_jobs_{event.lower()}_snapshot
+            AFTER {event} ON job_rows
+            BEGIN
+                UPDATE snapshot_months SET is_stale = 1 WHERE year_month IN ({months});
+            END
+            """
+        )
+
+    # 달마다 바뀔 때마다 1씩 올라가는 번호 (MonthCache 가 바뀐 달만 다시 읽도록)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS month_versions (
+            year_month TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+        """
+    )
+    for event, months in (
+        ("INSERT", ["NEW.dropoff_date"]),
+        ("UPDATE", ["OLD.dropoff_date", "NEW.dropoff_date"]),
+        ("DELETE", ["OLD.dropoff_date"]),
+    ):
+        bumps = "".join(
+            f"""
+                INSERT INTO month_versions (year_month, version) VALUES (substr({d}, 1, 7), 1)
+                ON CONFLICT (year_month) DO UPDATE SET version = version + 1;"""
+            for d in months
+        )
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_jobs_{event.lower()}_month_version
+            AFTER {event} ON job_rows
+            BEGIN{bumps}
+            END
+            """
+        )
+
+    # 영수증 프린터 출력 대기열 (shop_printer)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS print_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER NOT NULL,
+            mode TEXT NOT NULL DEFAULT 'new',
+            status TEXT NOT NULL DEFAULT 'queued',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            created_at TEXT NOT NULL,
+            sent_at TEXT,
+            claimed_at TEXT
+        )
+        """
+    )
+    # 보내기 시작한 시각 (claimed_at) 이 없던 DB 면 추가
+    cur.execute("PRAGMA table_info(print_queue)")
+    if "claimed_at" not in [row[1] for row in cur.fetchall()]:
+        cur.execute("ALTER TABLE print_queue ADD COLUMN claimed_at TEXT")
+    cur.execute(
+        "CREATE INDEX IF NOT EXISTS idx_print_queue_status ON print_queue(status, id)"
+    )
+    # 같은 건은 대기 / 보내는 중이 하나만 (동시에 두 번 눌러도 한 번만 출력)
+    if (
+        cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_print_queue_active'"
+        ).fetchone()
+        is None
+    ):
+        # 예전 DB 에 이미 겹쳐 들어간 요청이 있으면 하나(보내는 중 → 먼저 넣은 것)만 남김
+        cur.execute(
+            """
+            DELETE FROM print_queue
+            WHERE status IN ('queued', 'sending')
+              AND id NOT IN (
+                  SELECT (
+                      SELECT q.id FROM print_queue q
+                      WHERE q.job_id = a.job_id AND q.status IN ('queued', 'sending')
+                      ORDER BY q.status = 'sending' DESC, q.id
+                      LIMIT 1
+                  )
+                  FROM (SELECT DISTINCT job_id FROM print_queue
+                        WHERE status IN ('queued', 'sending')) a
+              )
+            """
+        )
+        cur.execute(
+            """
+            CREATE UNIQUE INDEX idx_print_queue_active ON print_queue(job_id)
+            WHERE status IN ('queued', 'sending')
+            """
+        )
+
+    # DB 정기 점검 기록 (shop_maintenance)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS maintenance_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_at TEXT NOT NULL,
+            task TEXT NOT NULL,
+            status TEXT NOT NULL,
+            seconds REAL NOT NULL,
+            detail TEXT
+        )
+        """
+    )
+
+    conn.commit()
+    conn.close()
+
+
+# 마감 기록(daily_closing / closing_days)에 들어가는 값 - 이것들이 바뀔 때만 다시 마감
+CLOSING_FIELDS = (
+    "dropoff_date",
+    "price",
+    "payment_method",
+    "is_prepaid",
+    "customer_name",
+    "customer_phone",
+)
+
+
+def _job_before_write(cur, job_id):
+    """수정 / 삭제 전 값 (마감 / 가격 통계를 고치는 데 필요한 것만)"""
+    keys = ("item_type", "work_hem", "work_sleeve", "work_width") + CLOSING_FIELDS
+    row = cur.execute(
+        f"SELECT {', '.join(keys)} FROM jobs WHERE id = ?",
+        (job_id,),
+    ).fetchone()
+    if row is None:
+        return None
+    return dict(zip(keys, row))
+
+
+def _mark_closing_stale(cur, dates):
+    """이미 마감한 날의 매출이 바뀌면 다시 마감해야 한다고 표시"""
+    dates = sorted({d for d in dates if d})
+    if not dates:
+        return
+    placeholders = ", ".join("?" for _ in dates)
+    cur.execute(
+        f"UPDATE closing_days SET is_stale = 1 WHERE close_date IN ({placeholders})",
+        dates,
+    )
+
+
+# jobs 뷰의 기본 컬럼 (생성 컬럼 제외)
+JOB_COLUMNS = (
+    "id",
+    "dropoff_date",
+    "customer_name",
+    "customer_phone",
+    "item_type",
+    "work_hem",
+    "work_sleeve",
+    "work_width",
+    "work_other",
+    "price",
+    "payment_method",
+    "is_prepaid",
+    "pickup_date",
+    "picked_up",
+    "memo",
+    "printed_count",
+    "created_at",
+)
+
+
+# 쓰기는 뷰가 아니라 job_rows 에 (뷰로는 lastrowid 를 못 얻음)
+# 옷 종류 / 결제수단은 이름으로 받아서 이름표 id 로 바꿔 저장 - 먼저 _add_names 로 넣어 둘 것
+INSERT_JOB_SQL = """
+    INSERT INTO job_rows (
+        dropoff_date, customer_name, customer_phone,
+        item_type_id, work_flags, work_other,
+        price, payment_method_id, is_prepaid, pickup_date,
+        picked_up, memo, printed_count, created_at
+    )
+    VALUES (
+        ?, ?, ?,
+        (SELECT id FROM item_types WHERE name = ?), ?, ?,
+        ?, (SELECT id FROM payment_methods WHERE name = ?), ?, ?,
+        ?, ?, 0, ?
+    )
+"""
+
+
+def _insert_params(
+    dropoff_date,
+    customer_name,
+    customer_phone,
+    item_type,
+    work_hem,
+    work_sleeve,
+    work_width,
+    work_other,
+    price,
+    payment_method,
+    is_prepaid,
+    pickup_date,
+    memo,
+    created_at=None,
+):
+    return (
+        dropoff_date,
+        customer_name,
+        format_phone(customer_phone),
+        item_type,
+        work_flags(work_hem, work_sleeve, work_width),
+        work_other,
+        price,
+        payment_method,
+        is_prepaid,
+        pickup_date,
+        0,
+        memo,
+        created_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    )
+
+
+def insert_job(
+    dropoff_date,
+    customer_name,
+    customer_phone,
+    item_type,
+    work_hem,
+    work_sleeve,
+    work_width,
+    work_other,
+    price,
+    payment_method,
+    is_prepaid,
+    pickup_date,
+    memo,
+):
+    conn = _connect()
+    cur = conn.cursor()
+    _add_names(cur, [item_type], [payment_method])
+    cur.execute(
+        INSERT_JOB_SQL,
+        _insert_params(
+            dropoff_date,
+            customer_name,
+            customer_phone,
+            item_type,
+            work_hem,
+            work_sleeve,
+            work_width,
+            work_other,
+            price,
+            payment_method,
+            is_prepaid,
+            pickup_date,
+            memo,
+        ),
+    )
+    job_id = cur.lastrowid
+    _mark_closing_stale(cur, [dropoff_date])
+    _price_hist_add(cur, item_type, work_hem, work_sleeve, work_width, price, 1)
+    conn.commit()
+    open_jobs.refresh(conn, [job_id])
+    conn.close()
+    return job_id
+
+
+def insert_jobs(jobs):
+    """
+    여러 벌을 한 트랜잭션으로 저장 (한 고객이 여러 벌 맡길 때).
+    jobs: insert_job 인자 이름을 키로 가진 dict 목록.
+    저장한 건수를 돌려준다.
+    """
+    if not jobs:
+        return 0
+
+    created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    params = [_insert_params(**job, created_at=created_at) for job in jobs]
+
+    conn = _connect()
+    try:
+        with conn:
+            cur = conn.cursor()
+            last_id = cur.execute("SELECT COALESCE(MAX(id), 0) FROM job_rows").fetchone()[0]
+            _add_names(
+                cur,
+                [job["item_type"] for job in jobs],
+                [job["payment_method"] for job in jobs],
+            )
+            cur.executemany(INSERT_JOB_SQL, params)
+            _mark_closing_stale(cur, [job["dropoff_date"] for job in jobs])
+            for job in jobs:
+                _price_hist_add(
+                    cur,
+                    job["item_type"],
+                    job["work_hem"],
+                    job["work_sleeve"],
+                    job["work_width"],
+                    job["price"],
+                    1,
+                )
+            new_ids = [
+                r[0] for r in cur.execute("SELECT id FROM job_rows WHERE id > ?", (last_id,))
+            ]
+        open_jobs.refresh(conn, new_ids)
+    finally:
+        conn.close()
+    return len(params)
+
+
+def update_job(
+    job_id,
+    dropoff_date,
+    customer_name,
+    customer_phone,
+    item_type,
+    work_hem,
+    work_sleeve,
+    work_width,
+    work_other,
+    price,
+    payment_method,
+    is_prepaid,
+    pickup_date,
+    picked_up,
+    memo,
+):
+    conn = _connect()
+    cur = conn.cursor()
+    old = _job_before_write(cur, job_id)
+    phone_formatted = format_phone(customer_phone)
+    _add_names(cur, [item_type], [payment_method])
+    cur.execute(
+        """
+        UPDATE job_rows SET
+            dropoff_date = ?,
+            customer_name = ?,
+            customer_phone = ?,
+            item_type_id = (SELECT id FROM item_types WHERE name = ?),
+            work_flags = ?,
+            work_other = ?,
+            price = ?,
+            payment_method_id = (SELECT id FROM payment_methods WHERE name = ?),
+            is_prepaid = ?,
+            pickup_date = ?,
+            picked_up = ?,
+            memo = ?
+        WHERE id = ?
+        """,
+        (
+            dropoff_date,
+            customer_name,
+            phone_formatted,
+            item_type,
+            work_flags(work_hem, work_sleeve, work_width),
+            work_other,
+            price,
+            payment_method,
+            is_prepaid,
+            pickup_date,
+            picked_up,
+            memo,
+            job_id,
+        ),
+    )
+    if old:
+        # 메모 / 찾음 / 작업 내용만 고친 경우는 마감 합계가 그대로
+        # (빈 이름 / 연락처는 마감 집계에서 '' 로 보므로 None 과 '' 은 같은 값)
+        new = {
+            "dropoff_date": dropoff_date,
+            "price": price,
+            "payment_method": payment_method,
+            "is_prepaid": is_prepaid,
+            "customer_name": customer_name,
+            "customer_phone": phone_formatted,
+        }
+        if any((old[k] or "") != (new[k] or "") for k in CLOSING_FIELDS):
+            _mark_closing_stale(cur, [old["dropoff_date"], dropoff_date])
+        _price_hist_add(cur, *_price_key_args(old), -1)
+        _price_hist_add(cur, item_type, work_hem, work_sleeve, work_width, price, 1)
+    conn.commit()
+    open_jobs.refresh(conn, [job_id])
+    conn.close()
+
+
+def delete_job(job_id):
+    conn = _connect()
+    cur = conn.cursor()
+    old = _job_before_write(cur, job_id)
+    cur.execute("DELETE FROM job_rows WHERE id = ?", (job_id,))
+    if old:
+        _mark_closing_stale(cur, [old["dropoff_date"]])
+        _price_hist_add(cur, *_price_key_args(old), -1)
+    conn.commit()
+    open_jobs.discard(job_id)
+    conn.close()
+
+
+def load_jobs(start_date=None, end_date=None):
+    conn = _connect()
+    query = "SELECT * FROM jobs"
+    params = []
+
+    if start_date and end_date:
+        query += " WHERE dropoff_day BETWEEN ? AND ?"
+        params = [
+            date.fromisoformat(start_date).toordinal(),
+            date.fromisoformat(end_date).toordinal(),
+        ]
+
+    query += " ORDER BY dropoff_day DESC, id DESC"
+    df = _read_df(query, conn, params=params)
+    conn.close()
+
+    if "printed_count" not in df.columns:
+        df["printed_count"] = 0
+
+    return df
+
+
+def load_jobs_by_pickup(target_date):
+    conn = _connect()
+    query = """
+        SELECT * FROM jobs
+        WHERE pickup_date = ? AND picked_up = 0
+        ORDER BY dropoff_date ASC, id ASC
+    """
+    df = _read_df(query, conn, params=[target_date])
+    conn.close()
+    if "printed_count" not in df.columns:
+        df["printed_count"] = 0
+    return df
+
+
+def load_pickup_calendar(start_date, end_date):
+    """
+    찾는 날별로 아직 안 찾아간 옷 개수 / 고객 수 / 작업 종류별 건수를 한 번에 집계.
+    idx_jobs_open_pickup 인덱스만 타도록 picked_up = 0 조건을 그대로 둔다.
+    """
+    conn = _connect()
+    query = """
+        SELECT
+            pickup_date,
+            COUNT(*) AS garments,
+            COUNT(DISTINCT COALESCE(customer_name, '') || '|' || COALESCE(customer_phone, '')) AS customers,
+            SUM(work_hem) AS work_hem,
+            SUM(work_sleeve) AS work_sleeve,
+            SUM(work_width) AS work_width,
+            SUM(CASE WHEN COALESCE(work_other, '') <> '' THEN 1 ELSE 0 END) AS work_other
+        FROM jobs
+        WHERE picked_up = 0 AND pickup_date BETWEEN ? AND ?
+        GROUP BY pickup_date
+        ORDER BY pickup_date ASC
+    """
+    df = _read_df(query, conn, params=[start_date, end_date])
+    conn.close()
+    return df
+
+
+# 경과일수 → 구간 (0~7일 / 8~30일 / 30일 초과)
+AGING_BUCKETS = ["0~7일", "8~30일", "30일 초과"]
+
+
+def _aging_bucket_sql(days_expr):
+    return f"""
+        CASE
+            WHEN {days_expr} <= 7 THEN '{AGING_BUCKETS[0]}'
+            WHEN {days_expr} <= 30 THEN '{AGING_BUCKETS[1]}'
+            ELSE '{AGING_BUCKETS[2]}'
+        END
+    """
+
+
+def load_overdue_jobs(today_str):
+    """찾는 날이 지났는데 아직 안 찾아간 옷 (idx_jobs_open_pickup 사용)"""
+    days = "CAST(julianday(?) - julianday(pickup_date) AS INTEGER)"
+    conn = _connect()
+    query = f"""
+        SELECT
+            id, pickup_date, dropoff_date, customer_name, customer_phone,
+            item_type, price, payment_method, is_prepaid,
+            {days} AS days_overdue,
+            {_aging_bucket_sql(days)} AS aging
+        FROM jobs
+        WHERE picked_up = 0 AND pickup_date < ?
+        ORDER BY pickup_date ASC, id ASC
+    """
+    df = _read_df(query, conn, params=[today_str, today_str, today_str, today_str])
+    conn.close()
+    return df
+
+
+def load_unpaid_jobs(today_str):
+    """나중에 결제하기로 하고 아직 돈을 못 받은 건 (idx_jobs_unpaid 사용)"""
+    days = "MAX(CAST(julianday(?) - julianday(dropoff_date) AS INTEGER), 0)"
+    conn = _connect()
+    query = f"""
+        SELECT
+            id, dropoff_date, pickup_date, customer_name, customer_phone,
+            item_type, price, payment_method, picked_up,
+            {days} AS days_outstanding,
+            {_aging_bucket_sql(days)} AS aging
+        FROM jobs
+        WHERE is_prepaid = 0
+        ORDER BY dropoff_date ASC, id ASC
+    """
+    df = _read_df(query, conn, params=[today_str, today_str, today_str])
+    conn.close()
+    return df
+
+
+def load_period_summary(group_col="year_month", exclude_months=()):
+    """
+    월(year_month) 또는 ISO 주(iso_week) 단위 매출 / 건수 / 고객수 집계
+    exclude_months: 빼고 집계할 연월 목록 (Parquet 스냅샷에서 따로 읽는 달, shop_analytics)
+    """
+    if group_col not in ("year_month", "iso_week"):
+        raise ValueError(f"지원하지 않는 묶음 단위: {group_col}")
+
+    conn = _connect()
+    query = f"""
+        SELECT
+            {group_col} AS period,
+            SUM(price) AS revenue,
+            COUNT(*) AS garments,
+            COUNT(DISTINCT COALESCE(customer_name, '') || '|' || COALESCE(customer_phone, '') || '|' || dropoff_date) AS customers
+        FROM jobs
+        WHERE year_month NOT IN (SELECT value FROM json_each(?))
+        GROUP BY {group_col}
+        ORDER BY {group_col} ASC
+    """
+    df = _read_df(query, conn, params=[json.dumps(list(exclude_months))])
+    conn.close()
+    return df
+
+
+def get_job(job_id):
+    """id 로 한 건을 dict 로 읽음 (pandas 없이 쓰는 곳용) - 없으면 None"""
+    conn = _connect()
+    conn.row_factory = sqlite3.Row
+    row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+
+def load_job_by_id(job_id):
+    conn = _connect()
+    df = _read_df("SELECT * FROM jobs WHERE id = ?", conn, params=[job_id])
+    conn.close()
+    if df.empty:
+        return None
+    if "printed_count" not in df.columns:
+        df["printed_count"] = 0
+    return df.iloc[0]
+
+
+def mark_picked_up(job_id):
+    conn = _connect()
+    cur = conn.cursor()
+    cur.execute("UPDATE job_rows SET picked_up = 1 WHERE id = ?", (job_id,))
+    conn.commit()
+    open_jobs.discard(job_id)
+    conn.close()
+
+
+def _mark_printed(cur, job_id):
+    cur.execute(
+        "UPDATE job_rows SET printed_count = COALESCE(printed_count,0) + 1 WHERE id = ?",
+        (job_id,),
+    )
+
+
+def mark_printed(job_id):
+    """전표를 출력했다고 표시 (printed_count + 1)"""
+    conn = _connect()
+    cur = conn.cursor()
+    _mark_printed(cur, job_id)
+    conn.commit()
+    open_jobs.refresh(conn, [job_id])
+    conn.close()
+
+
+# ---------------------------
+# 안 찾아간 옷 메모리 색인 (프로세스 공용)
+# ---------------------------
+_COL = {name: i for i, name in enumerate(JOB_COLUMNS)}
+
+
+class OpenJobIndex:
+    """
+    아직 안 찾아간(picked_up = 0) 옷만 메모리에 들고 있는 색인.
+    Streamlit 서버 프로세스 하나에 하나만 두고 모든 세션이 같이 읽는다.
+    쓰기 함수(insert_job / update_job / mark_* ...)가 저장 직후 바로 고쳐 주므로
+    대시보드는 DB 를 다시 읽지 않는다.
+
+    - 행은 id → 튜플 (JOB_COLUMNS 순서)
+    - 찾는 날 → id 집합, 아직 출력 안 한 id 집합을 따로 들고 있음
+    - generation: jobs 에 쓰기가 있을 때마다 1씩 올라가는 번호 (화면 캐시 키로 씀)
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._rows = None
+        self.generation = 0
+        self._by_pickup = defaultdict(set)
+        self._unprinted = set()
+
+    def _select_sql(self, where):
+        return f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE {where}"
+
+    def _ensure_loaded(self):
+        if self._rows is not None:
+            return
+        conn = _connect()
+        rows = conn.execute(self._select_sql("picked_up = 0")).fetchall()
+        conn.close()
+
+        self._rows = {}
+        self._by_pickup = defaultdict(set)
+        self._unprinted = set()
+        for row in rows:
+            self._add(row)
+
+    def _add(self, row):
+        job_id = row[_COL["id"]]
+        self._rows[job_id] = row
+        self._by_pickup[row[_COL["pickup_date"]]].add(job_id)
+        if not row[_COL["printed_count"]]:
+            self._unprinted.add(job_id)
+
+    def _remove(self, job_id):
+        row = self._rows.pop(job_id, None)
+        if row is None:
+            return
+        ids = self._by_pickup.get(row[_COL["pickup_date"]])
+        if ids is not None:
+            ids.discard(job_id)
+            if not ids:
+                del self._by_pickup[row[_COL["pickup_date"]]]
+        self._unprinted.discard(job_id)
+
+    def refresh(self, conn, job_ids):
+        """저장한 건을 DB 에서 다시 읽어 색인에 반영 (아직 안 읽어 뒀으면 아무것도 안 함)"""
+        with self._lock:
+            self.generation += 1
+            if self._rows is None or not job_ids:
+                return
+            ids = list(job_ids)
+            placeholders = ", ".join("?" for _ in ids)
+            rows = conn.execute(
+                self._select_sql(f"id IN ({placeholders})"), ids
+            ).fetchall()
+            for job_id in ids:
+                self._remove(job_id)
+            for row in rows:
+                if not row[_COL["picked_up"]]:
+                    self._add(row)
+
+    def discard(self, job_id):
+        with self._lock:
+            self.generation += 1
+            if self._rows is not None:
+                self._remove(job_id)
+
+    def invalidate(self):
+        """다음에 읽을 때 DB 에서 전부 다시 읽도록 비움"""
+        with self._lock:
+            self.generation += 1
+            self._rows = None
+
+    def _as_dicts(self, ids):
+        rows = sorted(
+            (self._rows[i] for i in ids),
+            key=lambda r: (r[_COL["dropoff_date"]], r[_COL["id"]]),
+        )
+        return [dict(zip(JOB_COLUMNS, row)) for row in rows]
+
+    def by_pickup(self, target_date):
+        with self._lock:
+            self._ensure_loaded()
+            return self._as_dicts(self._by_pickup.get(target_date, ()))
+
+    def unprinted(self):
+        with self._lock:
+            self._ensure_loaded()
+            return self._as_dicts(self._unprinted)
+
+    def __len__(self):
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._rows)
+
+
+open_jobs = OpenJobIndex()
+
+
+class DataVersionWatcher:
+    """
+    같은 DB 를 쓰는 다른 프로세스(계산대 / 휴대폰용 두 번째 서버 등)의 저장을 알아채는 감시 연결.
+
+    계속 열어 둔 연결 하나로 PRAGMA data_version 만 확인한다 (다른 연결이 커밋했을 때만 값이 바뀜).
+    바뀌었으면 change_log 에서 마지막으로 본 순번 이후 바뀐 jobs id 만 골라 open_jobs 에 반영하고
+    generation 을 올린다 → 화면 캐시 / 월 단위 캐시는 다음 조회 때 새로 읽는다.
+    change_log 가 동기화 내보내기로 지워져서 빈 구간이 있으면 색인을 통째로 다시 읽는다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conn = None
+        self._path = None
+        self._version = None
+        self._seq = 0
+        self.changes = 0
+
+    def _log_seq(self):
+        row = self._conn.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'change_log'"
+        ).fetchone()
+        return row[0] if row else 0
+
+    def check(self):
+        """다른 연결이 jobs 를 바꿨으면 반영하고 True"""
+        with self._lock:
+            if self._conn is None or self._path != DB_PATH:
+                if self._conn is not None:
+                    self._conn.close()
+                self._conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+                self._path = DB_PATH
+                self._version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+                self._seq = self._log_seq()
+                return False
+
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if version == self._version:
+                return False
+            self._version = version
+
+            # 두 조회 사이에 커밋이 끼어도 더 많이 읽을 뿐이고, 그 건은 다음 확인 때 한 번 더 반영됨
+            last_seq = self._log_seq()
+            if last_seq <= self._seq:
+                # jobs 말고 다른 표(마감 / 출력 대기열 등)만 바뀜
+                return False
+            first_seq = self._conn.execute("SELECT MIN(seq) FROM change_log").fetchone()[0]
+            if first_seq is None or first_seq > self._seq + 1:
+                job_ids = None
+            else:
+                job_ids = [
+                    r[0]
+                    for r in self._conn.execute(
+                        "SELECT DISTINCT job_id FROM change_log WHERE seq > ?", (self._seq,)
+                    )
+                ]
+            self._seq = last_seq
+
+            self.changes += 1
+            if job_ids is None:
+                open_jobs.invalidate()
+            else:
+                open_jobs.refresh(self._conn, job_ids)
+            return True
+
+
+data_version_watcher = DataVersionWatcher()
+
+
+def open_jobs_by_pickup(target_date):
+    """찾는 날이 target_date 인 안 찾아간 옷 (dict 목록, 메모리 색인에서 바로 읽음)"""
+    data_version_watcher.check()
+    return open_jobs.by_pickup(target_date)
+
+
+def open_jobs_unprinted():
+    """안 찾아간 옷 중 전표를 아직 한 번도 출력 안 한 건 (dict 목록)"""
+    data_version_watcher.check()
+    return open_jobs.unprinted()
+
+
+def data_generation():
+    """
+    jobs 에 쓰기가 있을 때마다 바뀌는 번호 (이 프로세스의 저장 + 다른 프로세스의 저장).
+    (날짜, data_generation()) 을 키로 캐시하면 저장 직후 저절로 새로 읽는다.
+    """
+    data_version_watcher.check()
+    return open_jobs.generation
+
+
+# ---------------------------
+# 기간 조회 결과 캐시 (월 단위) + 이웃 달 미리 읽기
+# ---------------------------
+def _month_of(day_str):
+    return day_str[:7]
+
+
+def _shift_month(year_month, n):
+    y, m = int(year_month[:4]), int(year_month[5:7])
+    y, m = divmod(y * 12 + m - 1 + n, 12)
+    return f"{y:04d}-{m + 1:02d}"
+
+
+def _month_range(year_month):
+    """연월 → (그 달 1일, 말일) 문자열"""
+    first = date.fromisoformat(f"{year_month}-01")
+    last = date.fromisoformat(f"{_shift_month(year_month, 1)}-01").toordinal() - 1
+    return first.isoformat(), date.fromordinal(last).isoformat()
+
+
+class MonthCache:
+    """
+    load_jobs 결과를 달마다 나눠 들고 있는 캐시 (프로세스 공용).
+    - 달 하나 = DataFrame 하나, 오래 안 쓴 달부터 버려서 max_bytes 안으로 유지
+    - 읽을 때 그 달의 month_versions 번호를 같이 기억해서, 그 달에 저장이 있었을 때만 다시 읽음
+      (오늘 매출을 저장해도 지난 달 캐시는 그대로 씀).
+      번호 표는 data_generation 이 바뀌었을 때만 DB 에서 다시 읽는다
+    - 기간을 읽어 준 뒤 앞뒤 달을 백그라운드 스레드에서 미리 읽어 둠
+      (다른 기간으로 옮기면 아직 시작 안 한 미리 읽기는 취소)
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, prefetch_back=2, prefetch_ahead=1):
+        self.max_bytes = max_bytes
+        self.prefetch_back = prefetch_back
+        self.prefetch_ahead = prefetch_ahead
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._months = OrderedDict()  # 연월 → (달 번호, DataFrame, 바이트)
+        self._bytes = 0
+        self._executor = None
+        self._pending = {}  # 연월 → Future
+        self._versions = {}  # 연월 → month_versions 번호
+        self._versions_generation = None
+
+    def versions(self):
+        """달마다의 바뀐 횟수 {연월: 번호} (저장이 있었을 때만 DB 에서 다시 읽음)"""
+        generation = data_generation()
+        if generation != self._versions_generation:
+            # 번호를 읽는 사이에 저장이 끼면 더 새 번호를 볼 뿐이라 캐시가 틀리지는 않음
+            conn = _connect()
+            versions = dict(conn.execute("SELECT year_month, version FROM month_versions"))
+            conn.close()
+            with self._lock:
+                self._versions = versions
+                self._versions_generation = generation
+        return self._versions
+
+    def _get(self, year_month):
+        version = self.versions().get(year_month, 0)
+        with self._lock:
+            entry = self._months.get(year_month)
+            if entry is None:
+                return None
+            if entry[0] != version:
+                self._drop(year_month)
+                return None
+            self._months.move_to_end(year_month)
+            return entry[1]
+
+    def _drop(self, year_month):
+        entry = self._months.pop(year_month, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def _load(self, year_month):
+        version = self.versions().get(year_month, 0)
+        df = load_jobs(*_month_range(year_month))
+        size = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            self._drop(year_month)
+            if size > self.max_bytes:
+                return df
+            self._months[year_month] = (version, df, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._months)))
+        return df
+
+    def month(self, year_month):
+        df = self._get(year_month)
+        if df is not None:
+            self.hits += 1
+            return df
+        self.misses += 1
+        return self._load(year_month)
+
+    def load(self, start_date, end_date):
+        """load_jobs(start_date, end_date) 와 같은 결과 (최근 날짜 먼저)"""
+        import pandas as pd
+
+        first, last = _month_of(start_date), _month_of(end_date)
+        months = []
+        m = last
+        while m >= first:
+            months.append(m)
+            m = _shift_month(m, -1)
+
+        frames = [self.month(m) for m in months]
+        self.prefetch(
+            [_shift_month(first, -i) for i in range(1, self.prefetch_back + 1)]
+            + [
+                _shift_month(last, i)
+                for i in range(1, self.prefetch_ahead + 1)
+                if _shift_month(last, i) <= _month_of(date.today().isoformat())
+            ]
+        )
+
+        non_empty = [f for f in frames if not f.empty]
+        if not non_empty:
+            return frames[0].copy()
+        df = pd.concat(non_empty, ignore_index=True)
+        in_range = (df["dropoff_date"] >= start_date) & (df["dropoff_date"] <= end_date)
+        return df[in_range].reset_index(drop=True)
+
+    def prefetch(self, months):
+        """
+        months 를 백그라운드에서 읽어 둠 (이미 있어도 그 뒤 바뀐 달이면 다시 읽음).
+        목록에 없는 대기 중 미리 읽기는 취소.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        versions = self.versions()
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="month-prefetch")
+            for m, future in list(self._pending.items()):
+                if m not in months and future.cancel():
+                    del self._pending[m]
+            for m in months:
+                if m in self._pending:
+                    continue
+                entry = self._months.get(m)
+                if entry is not None and entry[0] == versions.get(m, 0):
+                    continue
+                future = self._executor.submit(self._prefetch_one, m)
+                self._pending[m] = future
+
+    def _prefetch_one(self, year_month):
+        try:
+            if self._get(year_month) is None:
+                self._load(year_month)
+        finally:
+            with self._lock:
+                self._pending.pop(year_month, None)
+
+    def cancel_prefetch(self):
+        """다른 화면으로 옮겼을 때 - 아직 시작 안 한 미리 읽기를 모두 취소"""
+        with self._lock:
+            for m, future in list(self._pending.items()):
+                if future.cancel():
+                    del self._pending[m]
+
+    def clear(self):
+        with self._lock:
+            self._months.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "months": len(self._months),
+                "bytes": self._bytes,
+                "pending": len(self._pending),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+month_cache = MonthCache()
+
+
+def load_jobs_cached(start_date, end_date):
+    """
+    load_jobs 와 같지만 달 단위 캐시를 거침.
+    전표 출력 / 매출 내역 / 데이터 수정 화면에서 기간을 앞뒤 달로 옮길 때 바로 보이도록
+    이웃한 달도 미리 읽어 둔다.
+    """
+    return month_cache.load(start_date, end_date)
+
+
+def cancel_prefetch():
+    month_cache.cancel_prefetch()
+
+
+# ---------------------------
+# 가격 추천 (옷 종류 × 작업 조합별 가격 통계)
+# ---------------------------
+def work_flags(work_hem, work_sleeve, work_width):
+    """기장 / 소매 / 품 선택을 비트 하나씩으로 묶은 값 (1=기장, 2=소매, 4=품)"""
+    return (1 if work_hem else 0) | (2 if work_sleeve else 0) | (4 if work_width else 0)
+
+
+def _price_key_args(row):
+    return (row["item_type"], row["work_hem"], row["work_sleeve"], row["work_width"], row["price"])
+
+
+# price_hist 누적 개수로 25 / 50 / 75 백분위(해당 비율을 처음 넘는 가격)를 구함
+_PRICE_STATS_SQL = """
+    INSERT OR REPLACE INTO price_stats (item_type, work_flags, n, p25, p50, p75)
+    SELECT
+        item_type,
+        work_flags,
+        MAX(n),
+        MIN(CASE WHEN cum * 4 >= n THEN price END),
+        MIN(CASE WHEN cum * 2 >= n THEN price END),
+        MIN(CASE WHEN cum * 4 >= n * 3 THEN price END)
+    FROM (
+        SELECT
+            item_type,
+            work_flags,
+            price,
+            SUM(cnt) OVER (PARTITION BY item_type, work_flags ORDER BY price) AS cum,
+            SUM(cnt) OVER (PARTITION BY item_type, work_flags) AS n
+        FROM price_hist
+        {where}
+    )
+    GROUP BY item_type, work_flags
+"""
+
+
+def _price_hist_add(cur, item_type, work_hem, work_sleeve, work_width, price, delta):
+    """한 건 저장 / 삭제할 때 그 조합의 가격 분포와 백분위만 다시 계산"""
+    if not item_type or price is None:
+        return
+    flags = work_flags(work_hem, work_sleeve, work_width)
+    key = (item_type, flags)
+    cur.execute(
+        """
+        INSERT INTO price_hist (item_type, work_flags, price, cnt)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (item_type, work_flags, price) DO UPDATE SET cnt = cnt + excluded.cnt
+        """,
+        (*key, int(price), delta),
+    )
+    cur.execute(
+        "DELETE FROM price_hist WHERE item_type = ? AND work_flags = ? AND cnt <= 0", key
+    )
+    cur.execute("DELETE FROM price_stats WHERE item_type = ? AND work_flags = ?", key)
+    cur.execute(
+        _PRICE_STATS_SQL.format(where="WHERE item_type = ? AND work_flags = ?"), key
+    )
+
+
+def _rebuild_price_stats(cur):
+    cur.execute("DELETE FROM price_hist")
+    cur.execute("DELETE FROM price_stats")
+    cur.execute(
+        """
+        INSERT INTO price_hist (item_type, work_flags, price, cnt)
+        SELECT t.name, j.work_flags, j.price, COUNT(*)
+        FROM job_rows j
+        CROSS JOIN item_types t ON t.id = j.item_type_id
+        WHERE t.name <> '' AND j.price IS NOT NULL
+        GROUP BY 1, 2, 3
+        """
+    )
+    cur.execute(_PRICE_STATS_SQL.format(where=""))
+
+
+def rebuild_price_stats():
+    """전체 내역으로 가격 통계를 새로 만듦 (수정 / 삭제가 많이 쌓였을 때 정리용)"""
+    conn = _connect()
+    try:
+        with conn:
+            _rebuild_price_stats(conn.cursor())
+    finally:
+        conn.close()
+
+
+def suggest_price(item_type, work_hem, work_sleeve, work_width):
+    """
+    그 옷 종류 × 작업 조합의 보통 가격.
+    {"n", "p25", "p50", "p75"} 또는 기록이 없으면 None.
+    """
+    conn = _connect()
+    row = conn.execute(
+        """
+        SELECT n, p25, p50, p75 FROM price_stats
+        WHERE item_type = ? AND work_flags = ?
+        """,
+        (item_type, work_flags(work_hem, work_sleeve, work_width)),
+    ).fetchone()
+    conn.close()
+    if row is None:
+        return None
+    return dict(zip(("n", "p25", "p50", "p75"), row))
+
+
+# ---------------------------
+# 일일 마감
+# ---------------------------
+def load_day_totals(day_str):
+    """그날(맡긴 날 기준) 결제수단 / 선결제 여부별 합계를 jobs 에서 바로 집계"""
+    conn = _connect()
+    query = """
+        SELECT
+            payment_method,
+            is_prepaid,
+            COUNT(*) AS garments,
+            COUNT(DISTINCT COALESCE(customer_name, '') || '|' || COALESCE(customer_phone, '')) AS customers,
+            SUM(price) AS revenue
+        FROM jobs
+        WHERE dropoff_day = ?
+        GROUP BY payment_method, is_prepaid
+        ORDER BY payment_method, is_prepaid DESC
+    """
+    df = _read_df(query, conn, params=[date.fromisoformat(day_str).toordinal()])
+    conn.close()
+    return df
+
+
+def close_day(day_str):
+    """그날 합계를 daily_closing / closing_days 에 고정 (다시 마감하면 덮어씀)"""
+    day = date.fromisoformat(day_str).toordinal()
+    closed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    conn = _connect()
+    try:
+        with conn:
+            conn.execute("DELETE FROM daily_closing WHERE close_date = ?", (day_str,))
+            conn.execute(
+                """
+                INSERT INTO daily_closing (
+                    close_date, payment_method, is_prepaid,
+                    garments, customers, revenue
+                )
+                SELECT
+                    ?, payment_method, is_prepaid,
+                    COUNT(*),
+                    COUNT(DISTINCT COALESCE(customer_name, '') || '|' || COALESCE(customer_phone, '')),
+                    SUM(price)
+                FROM jobs
+                WHERE dropoff_day = ?
+                GROUP BY payment_method, is_prepaid
+                """,
+                (day_str, day),
+            )
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO closing_days (
+                    close_date, garments, customers, revenue, closed_at, is_stale
+                )
+                SELECT
+                    ?,
+                    COUNT(*),
+                    COUNT(DISTINCT COALESCE(customer_name, '') || '|' || COALESCE(customer_phone, '')),
+                    COALESCE(SUM(price), 0),
+                    ?,
+                    0
+                FROM jobs
+                WHERE dropoff_day = ?
+                """,
+                (day_str, closed_at, day),
+            )
+    finally:
+        conn.close()
+
+
+def load_closing_day(day_str):
+    """마감 기록 (closing_days 한 줄) - 마감 안 했으면 None"""
+    conn = _connect()
+    conn.row_factory = sqlite3.Row
+    row = conn.execute(
+        "SELECT * FROM closing_days WHERE close_date = ?", (day_str,)
+    ).fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+
+def load_closing_detail(day_str):
+    """마감 때 고정한 결제수단 / 선결제 여부별 합계"""
+    conn = _connect()
+    df = _read_df(
+        """
+        SELECT payment_method, is_prepaid, garments, customers, revenue
+        FROM daily_closing
+        WHERE close_date = ?
+        ORDER BY payment_method, is_prepaid DESC
+        """,
+        conn,
+        params=[day_str],
+    )
+    conn.close()
+    return df
+
+
+def load_stale_closings():
+    """마감 후에 수정 / 삭제 / 추가가 있어서 다시 마감해야 하는 날짜 목록"""
+    conn = _connect()
+    rows = conn.execute(
+        "SELECT close_date FROM closing_days WHERE is_stale = 1 ORDER BY close_date"
+    ).fetchall()
+    conn.close()
+    return [r[0] for r in rows]
+
+
+def load_closing_summary(group="month"):
+    """마감 기록만으로 월별(month) / 연도별(year) 합계 (jobs 는 다시 읽지 않음)"""
+    length = {"month": 7, "year": 4}[group]
+    conn = _connect()
+    df = _read_df(
+        f"""
+        SELECT
+            substr(d.close_date, 1, {length}) AS period,
+            COUNT(DISTINCT d.close_date) AS closed_days,
+            SUM(d.garments) AS garments,
+            SUM(d.revenue) AS revenue,
+            SUM(CASE WHEN d.payment_method = '카드' THEN d.revenue ELSE 0 END) AS card,
+            SUM(CASE WHEN d.payment_method = '현금' THEN d.revenue ELSE 0 END) AS cash,
+            SUM(CASE WHEN d.payment_method = '계좌이체' THEN d.revenue ELSE 0 END) AS transfer,
+            SUM(CASE WHEN d.is_prepaid = 0 THEN d.revenue ELSE 0 END) AS unpaid
+        FROM daily_closing d
+        GROUP BY period
+        ORDER BY period DESC
+        """,
+        conn,
+    )
+    conn.close()
+    return df
+
+
+# ---------------------------
+# 일별 매출 집계 (추세 / 작년 같은 기간 비교)
+# ---------------------------
+# 고객 = 같은 날 같은 이름 / 전화번호 (load_period_summary 와 같은 기준)
+_ROLLUP_SELECT = """
+    SELECT
+        j.dropoff_date,
+        SUM(j.price),
+        COUNT(*),
+        COUNT(DISTINCT COALESCE(j.customer_name, '') || '|' || COALESCE(j.customer_phone, ''))
+"""
+
+
+def _rollup_day_sql(day):
+    """day(SQL 식) 하루치 daily_rollup / daily_rollup_payment 를 다시 계산하는 문장들 (트리거 본문용)"""
+    day_num = f"CAST(julianday({day}) - 1721424.5 AS INTEGER)"
+    return f"""
+        DELETE FROM daily_rollup WHERE day = {day};
+        INSERT INTO daily_rollup (day, revenue, garments, customers)
+        {_ROLLUP_SELECT}
+        FROM job_rows j
+        WHERE j.dropoff_day = {day_num}
+        GROUP BY j.dropoff_date;
+        DELETE FROM daily_rollup_payment WHERE day = {day};
+        INSERT INTO daily_rollup_payment (day, revenue, garments, customers, payment_method)
+        {_ROLLUP_SELECT}, p.name
+        FROM job_rows j
+        CROSS JOIN payment_methods p ON p.id = j.payment_method_id
+        WHERE j.dropoff_day = {day_num}
+        GROUP BY j.dropoff_date, p.name;
+    """
+
+
+def _rebuild_daily_rollup(cur):
+    cur.execute("DELETE FROM daily_rollup")
+    cur.execute("DELETE FROM daily_rollup_payment")
+    cur.execute(
+        f"""
+        INSERT INTO daily_rollup (day, revenue, garments, customers)
+        {_ROLLUP_SELECT}
+        FROM job_rows j
+        GROUP BY j.dropoff_date
+        """
+    )
+    cur.execute(
+        f"""
+        INSERT INTO daily_rollup_payment (day, revenue, garments, customers, payment_method)
+        {_ROLLUP_SELECT}, p.name
+        FROM job_rows j
+        CROSS JOIN payment_methods p ON p.id = j.payment_method_id
+        GROUP BY j.dropoff_date, p.name
+        """
+    )
+
+
+def rebuild_daily_rollup():
+    """전체 내역으로 일별 집계를 새로 만듦"""
+    conn = _connect()
+    try:
+        with conn:
+            _rebuild_daily_rollup(conn.cursor())
+    finally:
+        conn.close()
+
+
+def load_daily_trend(start_date, end_date):
+    """
+    start_date ~ end_date 하루하루의 매출 / 건수 / 고객수와
+    7일 / 30일 이동평균(매출), 기간 누적 매출.
+    장사 안 한 날도 0 으로 넣어서(날짜 달력) 이동평균이 날짜 기준이 되게 하고,
+    30일 평균이 첫날부터 맞도록 29일 앞에서부터 계산한 뒤 잘라낸다.
+    daily_rollup 만 읽으므로 기간 길이만큼의 행만 다룬다.
+    """
+    conn = _connect()
+    df = _read_df(
+        """
+        WITH RECURSIVE calendar(day) AS (
+            SELECT date(?, '-29 days')
+            UNION ALL
+            SELECT date(day, '+1 day') FROM calendar WHERE day < ?
+        ),
+        daily AS (
+            SELECT
+                c.day,
+                COALESCE(r.revenue, 0) AS revenue,
+                COALESCE(r.garments, 0) AS garments,
+                COALESCE(r.customers, 0) AS customers
+            FROM calendar c
+            LEFT JOIN daily_rollup r ON r.day = c.day
+        ),
+        trend AS (
+            SELECT
+                day,
+                revenue,
+                garments,
+                customers,
+                AVG(revenue) OVER (ORDER BY day ROWS BETWEEN 6 PRECEDING AND CURRENT ROW) AS ma7,
+                AVG(revenue) OVER (ORDER BY day ROWS BETWEEN 29 PRECEDING AND CURRENT ROW) AS ma30
+            FROM daily
+        )
+        SELECT
+            day,
+            revenue,
+            garments,
+            customers,
+            ma7,
+            ma30,
+            SUM(revenue) OVER (ORDER BY day ROWS UNBOUNDED PRECEDING) AS cumulative
+        FROM trend
+        WHERE day >= ?
+        ORDER BY day
+        """,
+        conn,
+        params=[start_date, end_date, start_date],
+    )
+    conn.close()
+    return df
+
+
+def load_payment_trend(start_date, end_date):
+    """기간 안 날짜 × 결제수단별 매출 / 건수 (daily_rollup_payment)"""
+    conn = _connect()
+    df = _read_df(
+        """
+        SELECT day, payment_method, revenue, garments, customers
+        FROM daily_rollup_payment
+        WHERE day BETWEEN ? AND ?
+        ORDER BY day, payment_method
+        """,
+        conn,
+        params=[start_date, end_date],
+    )
+    conn.close()
+    return df
+
+
+def _same_day_last_year(d):
+    try:
+        return d.replace(year=d.year - 1)
+    except ValueError:
+        # 2월 29일 → 작년 2월 28일
+        return d.replace(year=d.year - 1, day=28)
+
+
+def load_month_to_date(today_str):
+    """
+    이번 달 1일 ~ 오늘과, 작년 같은 달 1일 ~ 같은 날의 매출 / 건수 / 고객수.
+    {"this": {...}, "last": {...}, "this_range": (시작, 끝), "last_range": (시작, 끝)}
+    """
+    today = date.fromisoformat(today_str)
+    last = _same_day_last_year(today)
+    this_range = (today.replace(day=1).isoformat(), today.isoformat())
+    last_range = (last.replace(day=1).isoformat(), last.isoformat())
+
+    conn = _connect()
+    rows = conn.execute(
+        """
+        SELECT
+            CASE WHEN day >= ? THEN 'this' ELSE 'last' END AS which,
+            COALESCE(SUM(revenue), 0),
+            COALESCE(SUM(garments), 0),
+            COALESCE(SUM(customers), 0)
+        FROM daily_rollup
+        WHERE day BETWEEN ? AND ? OR day BETWEEN ? AND ?
+        GROUP BY which
+        """,
+        (this_range[0], *this_range, *last_range),
+    ).fetchall()
+    conn.close()
+
+    result = {
+        "this": {"revenue": 0, "garments": 0, "customers": 0},
+        "last": {"revenue": 0, "garments": 0, "customers": 0},
+        "this_range": this_range,
+        "last_range": last_range,
+    }
+    for which, revenue, garments, customers in rows:
+        result[which] = {"revenue": revenue, "garments": garments, "customers": customers}
+    return result
+
+
+# ---------------------------
+# 전표 텍스트 생성 공통 함수
+# ---------------------------
+def job_tasks(row):
+    """작업 내용 목록 (기장 / 소매 / 품 / 기타 작업내용)"""
+    tasks = []
+    if row["work_hem"]:
+        tasks.append("기장")
+    if row["work_sleeve"]:
+        tasks.append("소매")
+    if row["work_width"]:
+        tasks.append("품")
+    if row["work_other"]:
+        tasks.append(row["work_other"])
+    return tasks
+
+
+def receipt_fields(row):
+    """전표에 찍을 값들 (화면용 텍스트 전표 / 영수증 프린터 공용)"""
+    tasks = job_tasks(row)
+    return {
+        "name": row["customer_name"] or "",
+        "phone": row["customer_phone"] or "",
+        "dropoff": row["dropoff_date"] or "",
+        "pickup": row["pickup_date"] or "",
+        "item": row["item_type"] or "",
+        "tasks": ", ".join(tasks) if tasks else "없음",
+        "payment_status": "결제 완료" if row["is_prepaid"] == 1 else "미결제",
+        "pay_method": row["payment_method"] or "",
+        "price": int(row["price"]) if row["price"] is not None else 0,
+        "id": row["id"],
+    }
+
+
+def build_receipt_text(row):
+    f = receipt_fields(row)
+    text = f"""────────────────────────
+        에벤에셀옷수선
+────────────────────────
+고객명: {f['name']}
+연락처: {f['phone']}
+
+맡긴날: {f['dropoff']}
+찾는날: {f['pickup']}
+
+종류: {f['item']}
+작업: {f['tasks']}
+
+결제 여부: {f['payment_status']}
+결제수단: {f['pay_method']}
+
+금액: {f['price']:,}원
+번호(ID): #{f['id']}
+────────────────────────
+        내부 보관용
+────────────────────────
+"""
+    return text
+
+
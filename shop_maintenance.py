@@ -0,0 +1,239 @@
+"""
+에벤에셀옷수선 매출장 - DB 정기 점검.
+
+가게가 한가할 때(화면 조작이 한동안 없을 때) 백그라운드 스레드에서
+PRAGMA optimize / ANALYZE / 증분 VACUUM / quick_check / 가격 통계 재계산 /
+분석용 Parquet 스냅샷 갱신을 돌린다.
+작업마다 시간 제한이 있어서 넘으면 중단하고, DB 잠금은 짧게만 기다리므로
+계산대에서 저장하는 것을 막지 않는다.
+"""
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import shop_analytics
+import shop_db
+
+# 한 번 점검할 때 증분 VACUUM 으로 돌려줄 최대 페이지 수
+VACUUM_PAGES_PER_RUN = 2000
+
+_last_activity = time.monotonic()
+_run_lock = threading.Lock()
+last_report = None
+
+
+def touch():
+    """화면이 한 번 그려질 때마다 호출 - 마지막 사용 시각을 기록"""
+    global _last_activity
+    _last_activity = time.monotonic()
+
+
+def idle_seconds():
+    return time.monotonic() - _last_activity
+
+
+def db_file_stats(timeout=0.2):
+    """파일 크기 / 페이지 수 / 빈 페이지 수 (DB 가 사용 중이면 페이지 정보는 None)"""
+    path = shop_db.DB_PATH
+    stats = {
+        "file_bytes": os.path.getsize(path) if os.path.exists(path) else 0,
+        "page_size": None,
+        "page_count": None,
+        "freelist_pages": None,
+        "auto_vacuum": None,
+    }
+    conn = sqlite3.connect(path, timeout=timeout)
+    try:
+        stats["page_size"] = conn.execute("PRAGMA page_size").fetchone()[0]
+        stats["page_count"] = conn.execute("PRAGMA page_count").fetchone()[0]
+        stats["freelist_pages"] = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        stats["auto_vacuum"] = {0: "none", 1: "full", 2: "incremental"}.get(mode, mode)
+    except sqlite3.OperationalError:
+        pass
+    finally:
+        conn.close()
+    return stats
+
+
+# ---------------------------
+# 점검 작업들 (각각 conn 하나를 받아서 결과 설명 문자열을 돌려줌)
+# ---------------------------
+def _task_optimize(conn):
+    conn.execute("PRAGMA optimize")
+    return ""
+
+
+def _task_analyze(conn):
+    # 큰 표도 일부만 훑어서 통계를 만들도록 제한
+    conn.execute("PRAGMA analysis_limit = 1000")
+    conn.execute("ANALYZE")
+    return ""
+
+
+def _task_incremental_vacuum(conn):
+    mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    if mode != 2:
+        # 처음 한 번은 증분 모드로 바꾸는 전체 VACUUM 이 필요함
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        return "auto_vacuum 을 incremental 로 변경 (전체 VACUUM)"
+    before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    conn.execute(f"PRAGMA incremental_vacuum({VACUUM_PAGES_PER_RUN})").fetchall()
+    after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return f"빈 페이지 {before} → {after}"
+
+
+def _task_quick_check(conn):
+    rows = [r[0] for r in conn.execute("PRAGMA quick_check")]
+    if rows != ["ok"]:
+        raise RuntimeError("; ".join(rows[:5]))
+    return "ok"
+
+
+def _task_price_stats(conn):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        shop_db._rebuild_price_stats(conn.cursor())
+        conn.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    return ""
+
+
+def _task_snapshot(conn):
+    written = shop_analytics.refresh_snapshot(conn)
+    return ", ".join(f"{m} {n}건" for m, n in written.items())
+
+
+TASKS = [
+    ("optimize", _task_optimize),
+    ("analyze", _task_analyze),
+    ("incremental_vacuum", _task_incremental_vacuum),
+    ("quick_check", _task_quick_check),
+    ("price_stats", _task_price_stats),
+    ("snapshot", _task_snapshot),
+]
+
+
+def _run_task(func, budget_seconds):
+    # 잠금은 0.2초만 기다리고, 시간이 넘으면 진행 핸들러가 중단시킴
+    conn = sqlite3.connect(shop_db.DB_PATH, timeout=0.2, isolation_level=None)
+    deadline = time.monotonic() + budget_seconds
+    conn.set_progress_handler(lambda: 1 if time.monotonic() > deadline else 0, 1000)
+    t0 = time.perf_counter()
+    try:
+        detail = func(conn)
+        status = "ok"
+    except sqlite3.OperationalError as e:
+        msg = str(e)
+        if "interrupted" in msg:
+            status, detail = "timeout", f"{budget_seconds}초 넘어서 중단"
+        elif "locked" in msg or "busy" in msg:
+            status, detail = "busy", "사용 중이라 건너뜀"
+        else:
+            status, detail = "error", msg
+    except Exception as e:
+        status, detail = "error", str(e)
+    finally:
+        conn.close()
+    return status, time.perf_counter() - t0, detail
+
+
+def run_maintenance(budget_seconds=2.0, tasks=None):
+    """
+    점검 작업을 차례로 실행하고 보고서(dict)를 돌려줌.
+    budget_seconds: 작업 하나에 쓸 수 있는 최대 시간(초)
+    """
+    global last_report
+    with _run_lock:
+        before = db_file_stats()
+
+        results = []
+        for name, func in TASKS:
+            if tasks is not None and name not in tasks:
+                continue
+            status, seconds, detail = _run_task(func, budget_seconds)
+            results.append(
+                {"task": name, "status": status, "seconds": round(seconds, 3), "detail": detail}
+            )
+
+        after = db_file_stats()
+        run_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        conn = sqlite3.connect(shop_db.DB_PATH, timeout=1.0)
+        try:
+            with conn:
+                conn.executemany(
+                    """
+                    INSERT INTO maintenance_log (run_at, task, status, seconds, detail)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    [(run_at, r["task"], r["status"], r["seconds"], r["detail"]) for r in results],
+                )
+        except sqlite3.OperationalError:
+            # 가게에서 저장 중이면 기록은 건너뜀 (보고서는 last_report 에 남음)
+            pass
+        finally:
+            conn.close()
+
+        last_report = {"run_at": run_at, "before": before, "after": after, "tasks": results}
+        return last_report
+
+
+def load_maintenance_log(limit=50):
+    conn = shop_db._connect()
+    df = shop_db._read_df(
+        "SELECT run_at, task, status, seconds, detail FROM maintenance_log ORDER BY id DESC LIMIT ?",
+        conn,
+        params=[limit],
+    )
+    conn.close()
+    return df
+
+
+# ---------------------------
+# 백그라운드 스케줄러
+# ---------------------------
+class MaintenanceScheduler:
+    """
+    interval_seconds 마다 한 번, 화면 조작이 idle_after 초 이상 없을 때만 점검을 돌린다.
+    """
+
+    def __init__(self, interval_seconds=24 * 3600, idle_after=300, budget_seconds=2.0, poll_seconds=30):
+        self.interval_seconds = interval_seconds
+        self.idle_after = idle_after
+        self.budget_seconds = budget_seconds
+        self.poll_seconds = poll_seconds
+        self.last_run = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="db-maintenance", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def due(self):
+        if self.last_run is not None and time.monotonic() - self.last_run < self.interval_seconds:
+            return False
+        return idle_seconds() >= self.idle_after
+
+    def _loop(self):
+        while not self._stop.wait(self.poll_seconds):
+            if self.due():
+                self.last_run = time.monotonic()
+                try:
+                    run_maintenance(self.budget_seconds)
+                except Exception:
+                    # 점검이 실패해도 가게 화면에는 영향 없게 다음 주기에 다시 시도
+                    pass
+
+
+def start_scheduler(**kwargs):
+    return MaintenanceScheduler(**kwargs).start()
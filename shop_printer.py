@@ -0,0 +1,395 @@
+"""
+에벤에셀옷수선 매출장 - 영수증(감열) 프린터 출력 대기열.
+
+전표 출력 요청을 DB 의 print_queue 표에 쌓아 두면 백그라운드 스레드가 하나씩 꺼내서
+ESC/POS 바이트로 바꾼 뒤 프린터로 보낸다. 프린터가 받았다고 확인된 뒤에만
+mark_printed 를 호출하므로, 프린터가 꺼져 있으면 출력 횟수가 올라가지 않고 다시 시도한다.
+
+보낼 곳은 환경변수 MOM_SHOP_PRINTER 로 정한다.
+- tcp://192.168.0.50:9100   네트워크 프린터 (RAW 9100 포트)
+- dev:///dev/usb/lp0        USB 프린터 장치 파일
+- dir://receipts            폴더에 .bin 파일로 저장 (프린터 없이 확인용, 기본값)
+"""
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import shop_db
+
+# 실패하면 몇 번까지 다시 보낼지
+MAX_ATTEMPTS = 5
+
+# 보내기 시작하고 이만큼(초) 지나도 끝나지 않은 건은 그 프로세스가 죽은 것으로 보고 다시 대기시킴
+# (프린터 연결 제한 시간보다 넉넉하게)
+CLAIM_TIMEOUT_SECONDS = 120
+
+# ---------------------------
+# ESC/POS 명령
+# ---------------------------
+ESC_INIT = b"\x1b@"
+KOREAN_ON = b"\x1c&"  # FS & : 한글(2바이트) 모드
+ALIGN_LEFT = b"\x1ba\x00"
+ALIGN_CENTER = b"\x1ba\x01"
+SIZE_NORMAL = b"\x1d!\x00"
+SIZE_DOUBLE = b"\x1d!\x11"
+BOLD_ON = b"\x1bE\x01"
+BOLD_OFF = b"\x1bE\x00"
+FEED_AND_CUT = b"\x1bd\x04" + b"\x1dVB\x00"
+
+
+# ---------------------------
+# 전표 배치 (한 번만 만들어 두고 재사용)
+# ---------------------------
+# (종류, 값) - text: 고정 글자, field: receipt_fields 의 키, rule: 구분선
+RECEIPT_LAYOUT = [
+    ("raw", ESC_INIT + KOREAN_ON + ALIGN_CENTER + SIZE_DOUBLE + BOLD_ON),
+    ("text", "에벤에셀옷수선\n"),
+    ("raw", SIZE_NORMAL + BOLD_OFF + ALIGN_LEFT),
+    ("rule", None),
+    ("text", "고객명: "), ("field", "name"), ("text", "\n"),
+    ("text", "연락처: "), ("field", "phone"), ("text", "\n\n"),
+    ("text", "맡긴날: "), ("field", "dropoff"), ("text", "\n"),
+    ("raw", BOLD_ON),
+    ("text", "찾는날: "), ("field", "pickup"), ("text", "\n\n"),
+    ("raw", BOLD_OFF),
+    ("text", "종류: "), ("field", "item"), ("text", "\n"),
+    ("text", "작업: "), ("field", "tasks"), ("text", "\n\n"),
+    ("text", "결제 여부: "), ("field", "payment_status"), ("text", "\n"),
+    ("text", "결제수단: "), ("field", "pay_method"), ("text", "\n\n"),
+    ("raw", SIZE_DOUBLE),
+    ("field", "price_text"), ("text", "\n"),
+    ("raw", SIZE_NORMAL),
+    ("text", "번호(ID): #"), ("field", "id"), ("text", "\n"),
+    ("rule", None),
+    ("raw", ALIGN_CENTER),
+    ("text", "내부 보관용\n"),
+    ("raw", ALIGN_LEFT + FEED_AND_CUT),
+]
+
+
+@lru_cache(maxsize=8)
+def compile_layout(columns=42, encoding="cp949"):
+    """
+    배치를 [고정 바이트 | 필드 이름] 목록으로 미리 바꿔 둠.
+    이웃한 고정 부분은 하나로 합쳐서, 전표마다 필드 값만 인코딩하면 된다.
+    """
+    parts = []
+    for kind, value in RECEIPT_LAYOUT:
+        if kind == "field":
+            parts.append(value)
+            continue
+        if kind == "raw":
+            chunk = value
+        elif kind == "rule":
+            chunk = ("-" * columns + "\n").encode(encoding)
+        else:
+            chunk = value.encode(encoding)
+        if parts and isinstance(parts[-1], bytes):
+            parts[-1] += chunk
+        else:
+            parts.append(chunk)
+    return tuple(parts)
+
+
+def render_escpos(row, columns=42, encoding="cp949"):
+    """jobs 한 건(dict / Series) → ESC/POS 바이트"""
+    fields = shop_db.receipt_fields(row)
+    fields["price_text"] = f"금액: {fields['price']:,}원"
+    out = []
+    for part in compile_layout(columns, encoding):
+        if isinstance(part, bytes):
+            out.append(part)
+        else:
+            out.append(str(fields[part]).encode(encoding, errors="replace"))
+    return b"".join(out)
+
+
+# ---------------------------
+# 보낼 곳 (프린터 / 장치 파일 / 폴더)
+# ---------------------------
+class TcpSink:
+    """네트워크 프린터 RAW 포트. sendall 이 끝나면 프린터가 받은 것으로 본다."""
+
+    def __init__(self, host, port=9100, timeout=5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def send(self, data, name):
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as sock:
+            sock.sendall(data)
+
+    def __str__(self):
+        return f"tcp://{self.host}:{self.port}"
+
+
+class DeviceSink:
+    """USB / 병렬 프린터 장치 파일 (/dev/usb/lp0 등)"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, data, name):
+        with open(self.path, "wb") as f:
+            f.write(data)
+            f.flush()
+
+    def __str__(self):
+        return f"dev://{self.path}"
+
+
+class DirectorySink:
+    """폴더에 전표 파일로 저장 (프린터 대신 확인용)"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def send(self, data, name):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{name}.bin")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def __str__(self):
+        return f"dir://{self.directory}"
+
+
+def sink_from_url(url):
+    if url.startswith("tcp://"):
+        host, _, port = url[len("tcp://"):].partition(":")
+        return TcpSink(host, int(port or 9100))
+    if url.startswith("dev://"):
+        return DeviceSink(url[len("dev://"):])
+    if url.startswith("dir://"):
+        return DirectorySink(url[len("dir://"):])
+    raise ValueError(f"알 수 없는 프린터 주소: {url}")
+
+
+def default_sink():
+    return sink_from_url(os.environ.get("MOM_SHOP_PRINTER", "dir://receipts"))
+
+
+# ---------------------------
+# 출력 대기열
+# ---------------------------
+def enqueue_receipt(job_id, mode="new"):
+    """
+    전표 출력 요청을 대기열에 넣음. 같은 건이 이미 대기 중이면 넣지 않는다.
+    (idx_print_queue_active 유니크 인덱스가 막으므로 여러 세션 / 프로세스가 동시에 눌러도 한 번만)
+    새로 넣었으면 True.
+    """
+    conn = shop_db._connect()
+    try:
+        with conn:
+            added = conn.execute(
+                "INSERT OR IGNORE INTO print_queue (job_id, mode, created_at) VALUES (?, ?, ?)",
+                (int(job_id), mode, _now()),
+            ).rowcount
+    finally:
+        conn.close()
+    if not added:
+        return False
+    _wake.set()
+    return True
+
+
+def queue_depth():
+    """상태별 대기열 건수 {"queued": n, "sending": n, "done": n, "failed": n}"""
+    conn = shop_db._connect()
+    rows = conn.execute("SELECT status, COUNT(*) FROM print_queue GROUP BY status").fetchall()
+    conn.close()
+    depth = {"queued": 0, "sending": 0, "done": 0, "failed": 0}
+    depth.update(dict(rows))
+    return depth
+
+
+def load_failed_prints(limit=20):
+    conn = shop_db._connect()
+    rows = conn.execute(
+        """
+        SELECT id, job_id, mode, attempts, error, created_at
+        FROM print_queue WHERE status = 'failed'
+        ORDER BY id DESC LIMIT ?
+        """,
+        (limit,),
+    ).fetchall()
+    conn.close()
+    keys = ("id", "job_id", "mode", "attempts", "error", "created_at")
+    return [dict(zip(keys, r)) for r in rows]
+
+
+def retry_failed():
+    conn = shop_db._connect()
+    with conn:
+        # 그 사이 같은 건이 새로 대기열에 들어갔으면 실패 기록은 그냥 지움
+        conn.execute(
+            """
+            UPDATE OR IGNORE print_queue SET status = 'queued', attempts = 0, error = NULL
+            WHERE status = 'failed'
+            """
+        )
+        conn.execute(
+            """
+            DELETE FROM print_queue
+            WHERE status = 'failed'
+              AND job_id IN (SELECT job_id FROM print_queue WHERE status IN ('queued', 'sending'))
+            """
+        )
+    conn.close()
+    _wake.set()
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _requeue_stale_claims(conn):
+    """
+    보내다가 멈춘 건(보낸 프로세스가 꺼졌을 때)을 다시 대기 상태로.
+    다른 서버 프로세스가 지금 보내고 있는 건은 claimed_at 이 최근이라 건드리지 않는다.
+    """
+    cutoff = (datetime.now() - timedelta(seconds=CLAIM_TIMEOUT_SECONDS)).strftime(
+        "%Y-%m-%d %H:%M:%S"
+    )
+    conn.execute(
+        """
+        UPDATE print_queue SET status = 'queued', claimed_at = NULL
+        WHERE status = 'sending' AND (claimed_at IS NULL OR claimed_at < ?)
+        """,
+        (cutoff,),
+    )
+
+
+def _claim_next(conn):
+    with conn:
+        _requeue_stale_claims(conn)
+        return conn.execute(
+            """
+            UPDATE print_queue
+            SET status = 'sending', attempts = attempts + 1, claimed_at = ?
+            WHERE id = (
+                SELECT id FROM print_queue WHERE status = 'queued' ORDER BY id LIMIT 1
+            )
+            RETURNING id, job_id, mode, attempts
+            """,
+            (_now(),),
+        ).fetchone()
+
+
+def _finish(conn, queue_id, attempts, status, error=None):
+    """
+    보낸 결과를 기록. 트랜잭션은 부르는 쪽에서.
+    attempts 가 그대로일 때만 (= 그 사이 다른 프로세스가 다시 가져가지 않았을 때만) 기록하고 True.
+    """
+    cur = conn.execute(
+        """
+        UPDATE print_queue SET status = ?, error = ?, sent_at = ?, claimed_at = NULL
+        WHERE id = ? AND status = 'sending' AND attempts = ?
+        """,
+        (status, error, _now() if status == "done" else None, queue_id, attempts),
+    )
+    return cur.rowcount == 1
+
+
+_wake = threading.Event()
+
+
+class PrintSpooler:
+    """대기열에서 하나씩 꺼내 ESC/POS 로 바꿔서 프린터로 보내는 백그라운드 스레드"""
+
+    def __init__(self, sink=None, columns=42, poll_seconds=2.0, retry_seconds=5.0):
+        self.sink = sink or default_sink()
+        self.columns = columns
+        self.poll_seconds = poll_seconds
+        self.retry_seconds = retry_seconds
+        self.sent = 0
+        self.sent_bytes = 0
+        self.failures = 0
+        self.busy_seconds = 0.0
+        self.started_at = time.monotonic()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="print-spooler", daemon=True)
+
+    def start(self):
+        # 지난번에 보내다가 꺼졌던 건은 다시 대기 상태로 (다른 프로세스가 보내는 중인 건은 그대로)
+        conn = shop_db._connect()
+        with conn:
+            _requeue_stale_claims(conn)
+        conn.close()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        _wake.set()
+
+    def stats(self):
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            "sink": str(self.sink),
+            "sent": self.sent,
+            "failures": self.failures,
+            "sent_bytes": self.sent_bytes,
+            "per_minute": self.sent * 60 / elapsed,
+            "avg_ms": self.busy_seconds * 1000 / self.sent if self.sent else 0.0,
+            **queue_depth(),
+        }
+
+    def process_one(self):
+        """대기열 한 건 처리. 처리할 게 없으면 False."""
+        conn = shop_db._connect()
+        try:
+            claimed = _claim_next(conn)
+            if claimed is None:
+                return False
+            queue_id, job_id, mode, attempts = claimed
+
+            t0 = time.perf_counter()
+            job = shop_db.get_job(job_id)
+            if job is None:
+                with conn:
+                    _finish(conn, queue_id, attempts, "failed", "삭제된 건")
+                return True
+            try:
+                data = render_escpos(job, self.columns)
+                self.sink.send(data, f"receipt_{queue_id:06d}_{job_id}")
+            except Exception as e:
+                self.failures += 1
+                status = "failed" if attempts >= MAX_ATTEMPTS else "queued"
+                with conn:
+                    _finish(conn, queue_id, attempts, status, str(e))
+                self._stop.wait(self.retry_seconds)
+                return True
+
+            # 프린터가 받은 뒤에만, 완료 기록과 같은 트랜잭션으로 출력 횟수를 올림
+            # (둘 사이에 꺼져서 다시 출력되거나 횟수가 두 번 올라가는 일이 없게)
+            with conn:
+                if _finish(conn, queue_id, attempts, "done"):
+                    shop_db._mark_printed(conn.cursor(), job_id)
+            shop_db.open_jobs.refresh(conn, [job_id])
+            self.sent += 1
+            self.sent_bytes += len(data)
+            self.busy_seconds += time.perf_counter() - t0
+            return True
+        finally:
+            conn.close()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                worked = self.process_one()
+            except Exception:
+                # DB 가 잠시 잠겼을 때 등 - 다음 주기에 다시 시도
+                worked = False
+            if not worked:
+                _wake.wait(self.poll_seconds)
+                _wake.clear()
+
+
+def start_spooler(**kwargs):
+    return PrintSpooler(**kwargs).start()
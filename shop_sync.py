@@ -0,0 +1,344 @@
+"""
+에벤에셀옷수선 매출장 - 매장 간 동기화.
+
+매장마다 자기 mom_shop.db 를 쓰다가(인터넷이 끊겨도 동작), 변경분만 작은 파일로
+내보내서 통합 DB 하나에 모은다.
+
+- 각 매장 DB 의 change_log 표에 jobs 입력 / 수정 / 삭제가 트리거로 쌓인다.
+- export: 마지막으로 내보낸 순번(seq) 이후 바뀐 건만 건별 최종 상태로 묶어 gzip JSON 파일로 쓴다.
+- import: 통합 DB 의 store_jobs 표에 (매장 id, 매장 번호) 를 키로 넣는다.
+  이미 반영한 파일을 다시 넣어도 결과가 같다.
+
+    python shop_sync.py store-id 본점
+    python shop_sync.py export changes_본점.json.gz
+    python shop_sync.py import combined.db changes_본점.json.gz changes_2호점.json.gz
+    python shop_sync.py summary combined.db
+"""
+import argparse
+import gzip
+import json
+import sqlite3
+from datetime import datetime
+
+import shop_db
+
+CHANGESET_FORMAT = 1
+
+_INTEGER_COLUMNS = {
+    "work_hem",
+    "work_sleeve",
+    "work_width",
+    "price",
+    "is_prepaid",
+    "picked_up",
+    "printed_count",
+}
+
+
+# ---------------------------
+# 매장 DB 쪽 (내보내기)
+# ---------------------------
+def _meta_get(conn, key, default=None):
+    row = conn.execute("SELECT value FROM store_meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def _meta_set(conn, key, value):
+    conn.execute(
+        "INSERT OR REPLACE INTO store_meta (key, value) VALUES (?, ?)", (key, str(value))
+    )
+
+
+def set_store_id(store_id):
+    conn = shop_db._connect()
+    with conn:
+        _meta_set(conn, "store_id", store_id)
+    conn.close()
+
+
+def get_store_id():
+    conn = shop_db._connect()
+    store_id = _meta_get(conn, "store_id")
+    conn.close()
+    return store_id
+
+
+def build_changeset(full=False):
+    """
+    마지막 내보내기 이후 바뀐 건을 모은 changeset(dict)을 만든다.
+    full=True 면 지금 있는 전체 건을 담는다. (처음 내보낼 때 / 통합 DB 를 다시 맞출 때)
+    """
+    conn = shop_db._connect()
+    try:
+        store_id = _meta_get(conn, "store_id")
+        if not store_id:
+            raise ValueError("매장 id 가 없습니다. 먼저 'python shop_sync.py store-id 이름' 을 실행하세요.")
+
+        last_seq = int(_meta_get(conn, "last_export_seq", 0))
+        # 내보낸 change_log 는 지우므로 새 변경이 없으면 지난 순번 그대로
+        to_seq = max(
+            last_seq,
+            conn.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0],
+        )
+        # 한 번도 안 내보냈으면 전체
+        full = full or last_seq == 0
+
+        columns = ", ".join(f"j.{c}" for c in shop_db.JOB_COLUMNS)
+        if full:
+            upserts = conn.execute(f"SELECT {columns} FROM jobs j ORDER BY j.id").fetchall()
+            deletes = []
+        else:
+            # 같은 건이 여러 번 바뀌었으면 마지막 상태 하나만 보냄
+            changed = """
+                SELECT DISTINCT job_id FROM change_log WHERE seq > ? AND seq <= ?
+            """
+            upserts = conn.execute(
+                f"""
+                SELECT {columns} FROM jobs j
+                WHERE j.id IN ({changed})
+                ORDER BY j.id
+                """,
+                (last_seq, to_seq),
+            ).fetchall()
+            deletes = [
+                r[0]
+                for r in conn.execute(
+                    f"""
+                    SELECT c.job_id FROM ({changed}) c
+                    WHERE NOT EXISTS (SELECT 1 FROM jobs WHERE id = c.job_id)
+                    ORDER BY c.job_id
+                    """,
+                    (last_seq, to_seq),
+                )
+            ]
+    finally:
+        conn.close()
+
+    return {
+        "format": CHANGESET_FORMAT,
+        "store_id": store_id,
+        "full": full,
+        "from_seq": 0 if full else last_seq,
+        "to_seq": to_seq,
+        "exported_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "columns": list(shop_db.JOB_COLUMNS),
+        "upserts": [list(r) for r in upserts],
+        "deletes": deletes,
+    }
+
+
+def export_changeset(path, full=False):
+    """
+    changeset 을 gzip JSON 파일로 쓰고, 내보낸 순번을 기록한 뒤 내보낸 change_log 는 지운다.
+    내보낸 건수 (upserts, deletes) 를 돌려준다.
+    """
+    changeset = build_changeset(full)
+    data = json.dumps(changeset, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    with gzip.open(path, "wb") as f:
+        f.write(data)
+
+    conn = shop_db._connect()
+    with conn:
+        _meta_set(conn, "last_export_seq", changeset["to_seq"])
+        conn.execute("DELETE FROM change_log WHERE seq <= ?", (changeset["to_seq"],))
+    conn.close()
+    return len(changeset["upserts"]), len(changeset["deletes"])
+
+
+def read_changeset(path):
+    with gzip.open(path, "rb") as f:
+        changeset = json.loads(f.read().decode("utf-8"))
+    if changeset.get("format") != CHANGESET_FORMAT:
+        raise ValueError(f"지원하지 않는 changeset 형식: {changeset.get('format')}")
+    return changeset
+
+
+# ---------------------------
+# 통합 DB 쪽 (가져오기)
+# ---------------------------
+def init_consolidated(conn):
+    column_defs = ",\n            ".join(
+        f"{c} {'INTEGER' if c in _INTEGER_COLUMNS else 'TEXT'}"
+        for c in shop_db.JOB_COLUMNS
+        if c != "id"
+    )
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS store_jobs (
+            store_id TEXT NOT NULL,
+            job_id INTEGER NOT NULL,
+            {column_defs},
+            PRIMARY KEY (store_id, job_id)
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_store_jobs_dropoff ON store_jobs(dropoff_date)"
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sync_state (
+            store_id TEXT PRIMARY KEY,
+            last_seq INTEGER NOT NULL,
+            imported_at TEXT NOT NULL
+        )
+        """
+    )
+    # 매장 구분 없이 보는 뷰 (global_id = 매장id-번호)
+    conn.execute(
+        """
+        CREATE VIEW IF NOT EXISTS all_jobs AS
+        SELECT store_id || '-' || job_id AS global_id, *
+        FROM store_jobs
+        """
+    )
+
+
+def apply_changeset(conn, changeset):
+    """
+    changeset 한 개를 통합 DB 에 반영. 반영했으면 True, 이미 반영된 것이면 False.
+    중간 변경분이 빠졌으면 ValueError.
+    """
+    store_id = changeset["store_id"]
+    row = conn.execute(
+        "SELECT last_seq FROM sync_state WHERE store_id = ?", (store_id,)
+    ).fetchone()
+    last_seq = row[0] if row else 0
+
+    if changeset["full"]:
+        # 이미 더 최근 것까지 반영했으면 옛날 전체 파일은 무시
+        if row and changeset["to_seq"] < last_seq:
+            return False
+    else:
+        if changeset["to_seq"] <= last_seq:
+            return False
+        if changeset["from_seq"] > last_seq:
+            raise ValueError(
+                f"{store_id}: {last_seq + 1}~{changeset['from_seq']} 번 변경분이 빠졌습니다. "
+                "전체 내보내기(--full) 파일로 다시 맞춰 주세요."
+            )
+
+    columns = changeset["columns"]
+    data_cols = [c for c in columns if c != "id"]
+    id_index = columns.index("id")
+    insert_cols = ["store_id", "job_id"] + data_cols
+    upsert_sql = f"""
+        INSERT INTO store_jobs ({', '.join(insert_cols)})
+        VALUES ({', '.join('?' for _ in insert_cols)})
+        ON CONFLICT (store_id, job_id) DO UPDATE SET
+            {', '.join(f'{c} = excluded.{c}' for c in data_cols)}
+    """
+    rows = [
+        [store_id, r[id_index]] + [v for i, v in enumerate(r) if i != id_index]
+        for r in changeset["upserts"]
+    ]
+
+    with conn:
+        if changeset["full"]:
+            # 전체 파일이면 거기에 없는 건은 매장에서 지워진 것
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS sync_keep (job_id INTEGER PRIMARY KEY)")
+            conn.execute("DELETE FROM sync_keep")
+            conn.executemany("INSERT INTO sync_keep VALUES (?)", [(r[1],) for r in rows])
+            conn.execute(
+                """
+                DELETE FROM store_jobs
+                WHERE store_id = ? AND job_id NOT IN (SELECT job_id FROM sync_keep)
+                """,
+                (store_id,),
+            )
+        conn.executemany(upsert_sql, rows)
+        conn.executemany(
+            "DELETE FROM store_jobs WHERE store_id = ? AND job_id = ?",
+            [(store_id, job_id) for job_id in changeset["deletes"]],
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO sync_state (store_id, last_seq, imported_at) VALUES (?, ?, ?)",
+            (
+                store_id,
+                changeset["to_seq"],
+                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            ),
+        )
+    return True
+
+
+def import_changesets(consolidated_path, paths):
+    """파일들을 순서대로 통합 DB 에 반영. 파일별 결과 목록을 돌려준다."""
+    conn = sqlite3.connect(consolidated_path)
+    try:
+        init_consolidated(conn)
+        results = []
+        for path in paths:
+            changeset = read_changeset(path)
+            applied = apply_changeset(conn, changeset)
+            results.append(
+                {
+                    "path": path,
+                    "store_id": changeset["store_id"],
+                    "applied": applied,
+                    "upserts": len(changeset["upserts"]),
+                    "deletes": len(changeset["deletes"]),
+                }
+            )
+        return results
+    finally:
+        conn.close()
+
+
+def load_combined_summary(consolidated_path):
+    """통합 DB 의 매장별 월 매출 / 건수"""
+    conn = sqlite3.connect(consolidated_path)
+    rows = conn.execute(
+        """
+        SELECT substr(dropoff_date, 1, 7) AS year_month, store_id, SUM(price), COUNT(*)
+        FROM store_jobs
+        GROUP BY year_month, store_id
+        ORDER BY year_month, store_id
+        """
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="매장 간 매출 동기화")
+    parser.add_argument("--db", help="매장 DB 경로 (기본: MOM_SHOP_DB 또는 mom_shop.db)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("store-id", help="이 매장 DB 의 매장 id 설정")
+    p.add_argument("store_id")
+
+    p = sub.add_parser("export", help="변경분 내보내기")
+    p.add_argument("out")
+    p.add_argument("--full", action="store_true", help="변경분 대신 전체 내보내기")
+
+    p = sub.add_parser("import", help="변경분 파일을 통합 DB 에 반영")
+    p.add_argument("consolidated")
+    p.add_argument("files", nargs="+")
+
+    p = sub.add_parser("summary", help="통합 DB 매장별 월 합계")
+    p.add_argument("consolidated")
+
+    args = parser.parse_args()
+    if args.db:
+        shop_db.DB_PATH = args.db
+
+    if args.command == "store-id":
+        shop_db.init_db()
+        set_store_id(args.store_id)
+        print(f"매장 id: {args.store_id}")
+    elif args.command == "export":
+        shop_db.init_db()
+        upserts, deletes = export_changeset(args.out, args.full)
+        print(f"{args.out}: 저장/수정 {upserts}건, 삭제 {deletes}건")
+    elif args.command == "import":
+        for r in import_changesets(args.consolidated, args.files):
+            state = "반영" if r["applied"] else "이미 반영됨"
+            print(f"{r['path']} ({r['store_id']}): {state} - 저장/수정 {r['upserts']}건, 삭제 {r['deletes']}건")
+    else:
+        for year_month, store_id, revenue, count in load_combined_summary(args.consolidated):
+            print(f"{year_month} {store_id}: {revenue:,}원 / {count}벌")
+
+
+if __name__ == "__main__":
+    main()
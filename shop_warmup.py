@@ -0,0 +1,168 @@
+"""
+에벤에셀옷수선 매출장 - 재부팅 뒤 첫 화면을 빠르게 (warm start).
+
+PC 를 켠 직후에는 DB 파일이 OS 캐시에 없고, 서버 프로세스의 메모리 색인 / 캐시도 비어 있어서
+첫 대시보드와 매출 내역이 느리다. 여기서는
+
+- 안 찾아간 옷 색인 / 월 단위 캐시를 미리 채우고
+- 자주 보는 페이지(안 찾아간 옷, 이번 달)를 SQLite 로 한 번 읽고
+- DB 파일을 한 번 쭉 읽어 OS 캐시에 올린다 (mmap 으로 읽는 shop_db._connect 가 바로 씀).
+
+Streamlit 서버에서는 첫 화면이 그려지는 동안 백그라운드 스레드로 돌고,
+부팅 스크립트에서 서버보다 먼저 `python shop_warmup.py` 로 돌려 둘 수도 있다
+(이때는 캐시 대신 pandas / streamlit 같은 무거운 라이브러리 파일을 OS 캐시에 올림).
+화면 그리는 시간은 LatencyLog 에 쌓아서 첫 화면과 평소 시간을 같이 보여 준다.
+"""
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from datetime import date
+
+import shop_db
+
+# OS 캐시에 올릴 때 한 번에 읽는 크기
+READ_CHUNK = 1024 * 1024
+
+last_report = None
+
+
+def preload_file(path=None):
+    """DB 파일을 처음부터 끝까지 읽음 (OS 파일 캐시 채우기). 읽은 바이트 수."""
+    path = path or shop_db.DB_PATH
+    if not os.path.exists(path):
+        return 0
+    total = 0
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                break
+            total += len(chunk)
+    return total
+
+
+def preload_hot_pages(today=None):
+    """자주 보는 부분(안 찾아간 옷 / 이번 달 / 이름표 / 가격 통계)의 표와 인덱스 페이지를 한 번 읽음"""
+    today = today or date.today()
+    first = date(today.year, today.month, 1)
+    conn = shop_db._connect()
+    try:
+        conn.execute("SELECT * FROM jobs WHERE picked_up = 0 AND pickup_date IS NOT NULL").fetchall()
+        conn.execute(
+            "SELECT * FROM jobs WHERE dropoff_day BETWEEN ? AND ?",
+            (first.toordinal(), today.toordinal()),
+        ).fetchall()
+        conn.execute("SELECT * FROM price_stats").fetchall()
+        conn.execute("SELECT * FROM closing_days ORDER BY close_date DESC LIMIT 60").fetchall()
+    finally:
+        conn.close()
+
+
+def preload_imports():
+    """무거운 라이브러리를 한 번 import 해서 그 파일들도 OS 캐시에 올려 둠 (서버보다 먼저 실행할 때)"""
+    import pandas  # noqa: F401
+    import pyarrow.parquet  # noqa: F401
+    import streamlit  # noqa: F401
+
+
+def prime_caches(today=None):
+    """안 찾아간 옷 색인과 이번 달(+ 앞 달 미리 읽기) 월 단위 캐시를 채움"""
+    today = today or date.today()
+    shop_db.open_jobs_by_pickup(today.isoformat())
+    shop_db.load_jobs_cached(date(today.year, today.month, 1).isoformat(), today.isoformat())
+
+
+def warm_up(read_file=True, prime=True):
+    """
+    단계별로 데워 두고 걸린 시간(ms)을 dict 로 돌려줌.
+    첫 화면에 필요한 것부터: 캐시 채우기 → 자주 보는 페이지 → 파일 전체.
+    read_file=False 면 파일 전체 읽기는 건너뜀, prime=False 면 이 프로세스 캐시는 안 채움
+    (서버보다 먼저 따로 실행할 때).
+    """
+    global last_report
+    steps = []
+    if prime:
+        steps.append(("caches", prime_caches))
+    else:
+        steps.append(("imports", preload_imports))
+    steps.append(("hot_pages", preload_hot_pages))
+    if read_file:
+        steps.append(("file", preload_file))
+
+    report = {"started_at": time.strftime("%Y-%m-%d %H:%M:%S"), "steps": {}}
+    t_start = time.perf_counter()
+    for name, func in steps:
+        t0 = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            # 데우기가 실패해도 화면은 평소처럼 DB 에서 읽으면 되므로 기록만 함
+            report["error"] = f"{name}: {e}"
+            break
+        report["steps"][name] = (time.perf_counter() - t0) * 1000
+    report["total_ms"] = (time.perf_counter() - t_start) * 1000
+    last_report = report
+    return report
+
+
+def start_warm_up(**kwargs):
+    thread = threading.Thread(target=warm_up, kwargs=kwargs, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+# ---------------------------
+# 화면 그리는 시간 기록 (첫 화면 / 평소)
+# ---------------------------
+class LatencyLog:
+    """서버 프로세스가 뜬 뒤 첫 화면 시간과, 그 뒤 최근 화면 시간들을 들고 있음"""
+
+    def __init__(self, keep=500):
+        self._lock = threading.Lock()
+        self.first = None  # (화면 이름, ms)
+        self._recent = deque(maxlen=keep)
+
+    def record(self, page, seconds):
+        ms = seconds * 1000
+        with self._lock:
+            if self.first is None:
+                self.first = (page, ms)
+            else:
+                self._recent.append((page, ms))
+
+    def summary(self):
+        """{"first_page", "first_ms", "count", "p50_ms", "p90_ms"} (평소 기록이 없으면 p50/p90 은 None)"""
+        with self._lock:
+            recent = [ms for _, ms in self._recent]
+            first = self.first
+        out = {
+            "first_page": first[0] if first else None,
+            "first_ms": first[1] if first else None,
+            "count": len(recent),
+            "p50_ms": None,
+            "p90_ms": None,
+        }
+        if recent:
+            out["p50_ms"] = statistics.median(recent)
+            out["p90_ms"] = (
+                statistics.quantiles(recent, n=10)[-1] if len(recent) >= 2 else recent[0]
+            )
+        return out
+
+
+def main():
+    if len(sys.argv) > 1:
+        shop_db.DB_PATH = sys.argv[1]
+    report = warm_up(prime=False)
+    for name, ms in report["steps"].items():
+        print(f"- {name:10s} {ms:8.1f} ms")
+    if "error" in report:
+        print(f"오류: {report['error']}")
+    print(f"합계 {report['total_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
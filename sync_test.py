@@ -0,0 +1,201 @@
+"""
+매장 간 동기화 테스트 (DB 파일 두 개 → 통합 DB).
+
+    python sync_test.py [건수]
+
+임시 폴더에 매장 DB 두 개(본점 / 2호점)를 만들고 shop_sync 로 변경분을 내보내서 통합 DB 에 모은다.
+처음 전체 내보내기 → 추가 / 수정 / 삭제 뒤 변경분 내보내기 → 같은 파일 다시 가져오기 →
+빠진 변경분 거부 → --full 다시 맞추기 순서로 진행하면서,
+매번 통합 DB 의 store_jobs 가 각 매장 jobs 와 똑같은지 확인한다. 어긋나면 AssertionError.
+"""
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+from datetime import date, timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+ITEMS = ["바지", "치마", "원피스", "외투/코트", "패딩", "셔츠/블라우스"]
+PAYMENTS = ["카드", "현금", "계좌이체"]
+STORES = ["본점", "2호점"]
+
+
+def random_job(rnd):
+    dropoff = date.today() - timedelta(days=rnd.randrange(60))
+    return {
+        "dropoff_date": dropoff.isoformat(),
+        "customer_name": f"고객{rnd.randint(1, 500)}",
+        "customer_phone": f"010{rnd.randint(10000000, 99999999)}",
+        "item_type": rnd.choice(ITEMS),
+        "work_hem": rnd.randint(0, 1),
+        "work_sleeve": rnd.randint(0, 1),
+        "work_width": rnd.randint(0, 1),
+        "work_other": "",
+        "price": rnd.choice([4000, 5000, 8000, 10000, 15000]),
+        "payment_method": rnd.choice(PAYMENTS),
+        "is_prepaid": 1 if rnd.random() < 0.8 else 0,
+        "pickup_date": (dropoff + timedelta(days=rnd.randint(1, 7))).isoformat(),
+        "memo": "",
+    }
+
+
+def use_store(shop_db, path):
+    shop_db.DB_PATH = path
+    shop_db.open_jobs.invalidate()
+
+
+def store_rows(shop_db, path):
+    """매장 jobs 를 {번호: 컬럼 값 튜플} 로"""
+    conn = sqlite3.connect(path)
+    rows = conn.execute(f"SELECT {', '.join(shop_db.JOB_COLUMNS)} FROM jobs").fetchall()
+    conn.close()
+    return {r[0]: tuple(r[1:]) for r in rows}
+
+
+def combined_rows(shop_db, consolidated, store_id):
+    columns = [c for c in shop_db.JOB_COLUMNS if c != "id"]
+    conn = sqlite3.connect(consolidated)
+    rows = conn.execute(
+        f"SELECT job_id, {', '.join(columns)} FROM store_jobs WHERE store_id = ?",
+        (store_id,),
+    ).fetchall()
+    conn.close()
+    return {r[0]: tuple(r[1:]) for r in rows}
+
+
+def assert_synced(shop_db, consolidated, stores, label):
+    for store_id, path in stores.items():
+        expected = store_rows(shop_db, path)
+        actual = combined_rows(shop_db, consolidated, store_id)
+        missing = expected.keys() - actual.keys()
+        extra = actual.keys() - expected.keys()
+        changed = [k for k in expected.keys() & actual.keys() if expected[k] != actual[k]]
+        assert not (missing or extra or changed), (
+            f"{label} / {store_id}: 빠짐 {sorted(missing)[:5]} 남음 {sorted(extra)[:5]} "
+            f"다름 {sorted(changed)[:5]}"
+        )
+        print(f"ok  {label} / {store_id}: {len(expected)}건 일치")
+
+
+def edit_store(shop_db, rnd, n_new, n_edit, n_delete):
+    """지금 매장 DB 에 추가 / 수정 / 삭제. 찾음 / 출력 표시도 섞음."""
+    shop_db.insert_jobs([random_job(rnd) for _ in range(n_new)])
+    conn = shop_db._connect()
+    ids = [r[0] for r in conn.execute("SELECT id FROM job_rows")]
+    conn.close()
+    rnd.shuffle(ids)
+    edits, deletes = ids[:n_edit], ids[n_edit:n_edit + n_delete]
+    for job_id in edits:
+        job = shop_db.get_job(job_id)
+        action = rnd.choice(["update", "picked_up", "printed"])
+        if action == "picked_up":
+            shop_db.mark_picked_up(job_id)
+        elif action == "printed":
+            shop_db.mark_printed(job_id)
+        else:
+            changed = random_job(rnd)
+            shop_db.update_job(
+                job_id,
+                job["dropoff_date"],
+                job["customer_name"],
+                job["customer_phone"],
+                changed["item_type"],
+                changed["work_hem"],
+                changed["work_sleeve"],
+                changed["work_width"],
+                "",
+                changed["price"],
+                changed["payment_method"],
+                job["is_prepaid"],
+                job["pickup_date"],
+                job["picked_up"],
+                "수정함",
+            )
+    for job_id in deletes:
+        shop_db.delete_job(job_id)
+
+
+def main():
+    n_jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    work = tempfile.mkdtemp(prefix="sync_test_")
+    stores = {s: os.path.join(work, f"store_{i}.db") for i, s in enumerate(STORES)}
+    consolidated = os.path.join(work, "combined.db")
+    # shop_db 를 import 하기 전에 DB 경로를 정해야 함
+    os.environ["MOM_SHOP_DB"] = stores[STORES[0]]
+    sys.path.insert(0, HERE)
+    import shop_db
+    import shop_sync
+
+    rnd = random.Random(0)
+    counter = [0]
+
+    def export(store_id, full=False):
+        counter[0] += 1
+        use_store(shop_db, stores[store_id])
+        path = os.path.join(work, f"{counter[0]:02d}_{store_id}.json.gz")
+        shop_sync.export_changeset(path, full=full)
+        return path
+
+    def import_files(paths):
+        return [r["applied"] for r in shop_sync.import_changesets(consolidated, paths)]
+
+    # 1. 매장 DB 두 개 만들고 처음 내보내기 (전체)
+    for store_id, path in stores.items():
+        use_store(shop_db, path)
+        shop_db.init_db()
+        shop_sync.set_store_id(store_id)
+        shop_db.insert_jobs([random_job(rnd) for _ in range(n_jobs // 2)])
+    first = [export(s) for s in STORES]
+    assert import_files(first) == [True, True]
+    assert_synced(shop_db, consolidated, stores, "처음 전체")
+
+    # 2. 양쪽에서 추가 / 수정 / 삭제 → 변경분만 내보내기
+    second = []
+    for store_id in STORES:
+        use_store(shop_db, stores[store_id])
+        edit_store(shop_db, rnd, n_new=n_jobs // 20, n_edit=n_jobs // 20, n_delete=n_jobs // 50)
+        second.append(export(store_id))
+    assert import_files(second) == [True, True]
+    assert_synced(shop_db, consolidated, stores, "변경분")
+
+    # 3. 같은 파일을 다시 넣어도 결과가 같음
+    assert import_files(first + second) == [False] * 4
+    assert_synced(shop_db, consolidated, stores, "다시 가져오기")
+
+    # 4. 변경분 하나를 건너뛰면 거부
+    store_id = STORES[0]
+    use_store(shop_db, stores[store_id])
+    edit_store(shop_db, rnd, n_new=10, n_edit=10, n_delete=5)
+    skipped = export(store_id)
+    edit_store(shop_db, rnd, n_new=10, n_edit=10, n_delete=5)
+    after_gap = export(store_id)
+    try:
+        import_files([after_gap])
+    except ValueError as e:
+        print(f"ok  빠진 변경분 거부: {e}")
+    else:
+        raise AssertionError("빠진 변경분이 있는데 가져오기가 성공함")
+
+    # 5. --full 로 다시 맞춤 (그 사이 지워진 건도 통합 DB 에서 지워져야 함)
+    full = export(store_id, full=True)
+    assert import_files([full]) == [True]
+    assert_synced(shop_db, consolidated, stores, "--full 다시 맞추기")
+    # 옛 변경분 파일은 이제 무시됨
+    assert import_files([skipped, after_gap]) == [False, False]
+    assert_synced(shop_db, consolidated, stores, "옛 파일 무시")
+
+    # 6. 다시 맞춘 뒤에도 변경분 내보내기가 이어짐
+    for store_id in STORES:
+        use_store(shop_db, stores[store_id])
+        edit_store(shop_db, rnd, n_new=20, n_edit=20, n_delete=10)
+    assert import_files([export(s) for s in STORES]) == [True, True]
+    assert_synced(shop_db, consolidated, stores, "다시 맞춘 뒤 변경분")
+
+    for year_month, store_id, revenue, count in shop_sync.load_combined_summary(consolidated)[-4:]:
+        print(f"{year_month} {store_id}: {revenue:,}원 / {count}벌")
+
+
+if __name__ == "__main__":
+    main()